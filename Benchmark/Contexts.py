@@ -0,0 +1,108 @@
+#Copyright (c) Hans Andersson 2011
+#All rights reserved.
+
+#########################################
+### SYNTHETIC CONTEXTS FOR BENCHMARKS ###
+#########################################
+
+#Dictionaries shaped like those the game environments pass to Decision (cf Acquire/Environment.py, Polity/Environment.py)
+#Each decision comes as Enumeration.toDicts() would render it: one dictionary per option, all nesting one context
+#Each game gives the decisions of one turn, every kind it prompts for once, as (outputsType, dictionaries) pairs
+
+#cf Acquire.Environment.Game.getDictForPlayer()
+def acquireContext(rng): #recursive float dictionary
+	#rng : random.Random
+	return { \
+	"game":{"safe":rng.random(), "size":rng.random(), "full":rng.random(), "oths":rng.random()}, \
+	"agnt":{"lqdt":rng.random()} \
+	}
+
+#cf Acquire.Environment.Corporation.getDictForPlayer()
+def corporationContext(rng): #float dictionary
+	#rng : random.Random
+	return dict([(key, rng.random()) for key in \
+	("tier", "size", "pric", "avbl", "sout", "safe", "sprd", "ownp", "plda", "bons", "adjt")])
+
+#A tile placement (cf Acquire.Environment.Game.promptPlacement())
+def acquirePlacement(rng, optionsCount): #(string, recursive float dictionary list)
+	#rng : random.Random
+	#optionsCount : int
+	context = acquireContext(rng)
+	return "pmnt", [{"context":context, "tile":{"pstn":{"cenr":rng.random(), "cenc":rng.random()}, \
+	"fnds":rng.random(), "mrgs":rng.random(), "bons":rng.random()}} for o in range(optionsCount)]
+
+#The defunct shares of a merger, by turns (cf Acquire.Environment.Game.mergeCorporations())
+def acquireTactic(rng, optionsCount): #(string, recursive float dictionary list)
+	#rng : random.Random
+	#optionsCount : int
+	context = acquireContext(rng)
+	gain, lose = corporationContext(rng), corporationContext(rng)
+	return "tact", [{"context":context, ("hold", "sell", "exch")[o % 3]:{"gain":gain, "lose":lose}} for o in range(optionsCount)]
+
+#A founding (cf Acquire.Environment.Game.promptFound())
+def acquireFounding(rng, optionsCount): #(string, recursive float dictionary list)
+	#rng : random.Random
+	#optionsCount : int
+	context = acquireContext(rng)
+	return "foun", [{"context":context, "newc":{"tier":rng.random(), "held":rng.random(), "plsh":rng.random()}} \
+	for o in range(optionsCount)]
+
+#A purchase, or none (cf Acquire.Environment.Game.promptBuys())
+def acquirePurchase(rng, optionsCount): #(string, recursive float dictionary list)
+	#rng : random.Random
+	#optionsCount : int
+	context = acquireContext(rng)
+	return "prch", [{"context":context, "save":{}}] + \
+	[{"context":context, "corp":corporationContext(rng)} for o in range(optionsCount - 1)]
+
+#The survivor of a merger (cf Acquire.Environment.Game.promptLargest())
+def acquireSurvivor(rng, optionsCount): #(string, recursive float dictionary list)
+	#rng : random.Random
+	#optionsCount : int
+	context = acquireContext(rng)
+	return "surv", [{"context":context, "corp":corporationContext(rng)} for o in range(optionsCount)]
+
+def acquireTurn(rng, optionsCount): #(string, recursive float dictionary list) list
+	#rng : random.Random
+	#optionsCount : int
+	return [decision(rng, optionsCount) for decision in \
+	(acquirePlacement, acquireTactic, acquireFounding, acquirePurchase, acquireSurvivor)]
+
+#cf Polity.Environment.Empire.dictRepr() and Polity.Environment.Game.doRound()
+def polityContext(rng): #recursive float dictionary
+	#rng : random.Random
+	position = dict([(key, rng.random()) for key in \
+	("_popln", "_infrs", "_matrl", "growth", "dvlpmt", "prdctn", "_milty", "_cultr", "_techy", "prepar", "willin", "_progr")])
+	return { \
+	"position":position, \
+	"standing":{"absolute":rng.random(), "relative":rng.random()}, \
+	"order":rng.random(), \
+	"share":rng.random(), \
+	"time":rng.random() \
+	}
+
+#A choice of action: bide, research, or attack one of the others
+def polityDecision(rng, optionsCount): #(string, recursive float dictionary list)
+	#rng : random.Random
+	#optionsCount : int
+	context = polityContext(rng)
+	representations = []
+	for o in range(optionsCount):
+		if o == 0: representations.append({"context":context, "bide":[rng.random(), rng.random()]})
+		elif o == 1: representations.append({"context":context, "research":[rng.random(), rng.random()]})
+		else: representations.append({"context":context, "attack":polityContext(rng)})
+	return "action", representations
+
+def polityTurn(rng, optionsCount): #(string, recursive float dictionary list) list
+	#rng : random.Random
+	#optionsCount : int
+	return [polityDecision(rng, optionsCount)]
+
+#The same dictionary, with the suffix on every key at every level: new kinds, hence cortices of their own
+def suffixed(representation, suffix): #recursive float dictionary
+	#representation : recursive float dictionary
+	#suffix : string
+	if type(representation) != type(dict()): return representation
+	return dict([(key + suffix, suffixed(value, suffix)) for key, value in representation.items()])
+
+contexts = {"Acquire":acquireTurn, "Polity":polityTurn}
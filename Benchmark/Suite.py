@@ -0,0 +1,247 @@
+#Copyright (c) Hans Andersson 2011
+#All rights reserved.
+
+import os, random, timeit, json, shutil, tempfile, platform
+
+import NeuralNetwork
+from Benchmark import Contexts
+
+#######################
+### BENCHMARK SUITE ###
+#######################
+
+#Times the hot operations of NeuralNetwork at several sizes, on synthetic brains and stimuli only
+#Results are microseconds per call (the best of several repeats), keyed "operation[size]"
+
+#Each case builds its own fixtures, then returns the call to time
+#Cases take the size and a seeded random.Random; the global random module is seeded, too (cf run(), infra)
+
+def neuronFeed(size, rng):
+	neuron = NeuralNetwork.Neuron([rng.uniform(-0.1, 0.1) for w in range(size + 1)])
+	stimuli = [rng.random() for i in range(size)]
+	return lambda: neuron.feed(stimuli)
+
+#density : the share of inputs that aren't 0.0 (cf Cortex.sparse())
+def cortexFor(size, rng, vectorized, density = 1.0):
+	brain = NeuralNetwork.Brain(vectorized = vectorized)
+	brain.typeDimensions["inputs"] = size
+	cortex = brain.cortexForKeys((NeuralNetwork.Signature.intern("inputs"),), size, "outputs", max(1, size // 4))
+	#time the vectorized path even where the Brain would deem the cortex too small for it
+	cortex.vectorized = vectorized and cortex.vectorizable
+	inputs = [rng.random() for i in range(size)]
+	if density < 1.0: inputs = [input if rng.random() < density else 0.0 for input in inputs]
+	return cortex, inputs
+
+def cortexFeed(size, rng, vectorized = False, density = 1.0):
+	cortex, inputs = cortexFor(size, rng, vectorized, density)
+	return lambda: cortex.feed(inputs)
+
+def cortexBack(size, rng, vectorized = False, density = 1.0):
+	cortex, inputs = cortexFor(size, rng, vectorized, density)
+	faults = [rng.uniform(-0.5, 0.5) for axon in cortex.axons]
+	def back():
+		cortex.back(inputs, faults)
+		#drop what we've backed, lest it pile up over the repeats
+		for neuron in cortex.dendrons + cortex.axons: neuron.backs, neuron.backsCount = None, 0
+	return back
+
+#A Brain that has already seen the kinds of the decisions of a turn, with as many options each as the size
+#   (so that timing excludes growing new cortices)
+def brainFor(game, size, rng):
+	decisions = Contexts.contexts[game](rng, size)
+	brain = NeuralNetwork.Brain()
+	for outputsType, representations in decisions:
+		for representation in representations: brain.feedForward(NeuralNetwork.Stimulus.fromDict(representation), outputsType, 1)
+	return brain, decisions
+
+def stimulusFromDict(game, size, rng):
+	decisions = Contexts.contexts[game](rng, size)
+	def fromDict():
+		for outputsType, representations in decisions:
+			memo = {}
+			for representation in representations: NeuralNetwork.Stimulus.fromDict(representation, memo)
+	return fromDict
+
+#Every option of every decision of a turn, each from a fresh Stimulus (as Decision.Enumeration.through() would)
+def brainFeedForward(game, size, rng):
+	brain, decisions = brainFor(game, size, rng)
+	def feedForward():
+		for outputsType, representations in decisions:
+			memo = {}
+			for representation in representations:
+				brain.feedForward(NeuralNetwork.Stimulus.fromDict(representation, memo), outputsType, 1)
+	return feedForward
+
+#Every option of every decision of a turn, backed with a fault each (as Interface.AI.learn() would)
+def brainFeedBackward(game, size, rng):
+	brain, decisions = brainFor(game, size, rng)
+	def feedBackward():
+		for outputsType, representations in decisions:
+			for representation in representations:
+				brain.feedBackward([0.1], outputsType, NeuralNetwork.Stimulus.fromDict(representation))
+		for neuron in brain.dirty: neuron.backs, neuron.backsCount = None, 0
+		brain.dirty = set()
+	return feedBackward
+
+#A Brain that has seen a turn of every game as many times as the size, each time with keys of new kinds
+#   (cf Contexts.suffixed()), so that its cortices and neurons grow with the size; at size 1, it's the size of a played brain
+#   It's saved to (or loaded from) a scratch directory
+def brainFile(size, rng, binary):
+	brain = NeuralNetwork.Brain(binary = binary)
+	for game in sorted(Contexts.contexts):
+		for s in range(size):
+			suffix = str(s) if s > 0 else ""
+			for outputsType, representations in Contexts.contexts[game](rng, 4):
+				for representation in representations:
+					brain.feedForward(NeuralNetwork.Stimulus.fromDict(Contexts.suffixed(representation, suffix)), outputsType + suffix, 1)
+	directory = tempfile.mkdtemp()
+	brain.saveToPath(os.path.join(directory, "brain"))
+	return brain, directory
+
+def brainSave(size, rng, binary = False):
+	brain, directory = brainFile(size, rng, binary)
+	call = lambda: brain.saveToPath(os.path.join(directory, "brain"))
+	call.directory = directory
+	return call
+
+def brainLoad(size, rng, binary = False, lazy = False):
+	brain, directory = brainFile(size, rng, binary)
+	call = lambda: NeuralNetwork.Brain(os.path.join(directory, "brain"), lazy = lazy)
+	call.directory = directory
+	return call
+
+#A sixteenth of the neurons changed since the last save, then checkpointed (as GeneticArena.Manager.teachStudents() would);
+#   the journal (or, in a pool file, the journal records) fills up and gets compacted over the calls, as it would over training sessions
+def brainCheckpoint(size, rng, binary = False, pooled = False):
+	brain, directory = brainFile(size, rng, binary)
+	if pooled: brain.saveToStore(NeuralNetwork.BrainStore(os.path.join(directory, "pool")), "brain")
+	neurons = list(brain.neurons.values())
+	def checkpoint():
+		brain.changed.update(rng.sample(neurons, max(1, len(neurons) // 16)))
+		brain.checkpoint()
+	checkpoint.directory = directory
+	return checkpoint
+
+#A pool file of as many children of such a Brain as the size, all loaded lazily in one go
+#   (as GeneticArena.Manager.getAIs() would, with a store)
+def storeBrains(size, rng):
+	brain, directory = brainFile(1, rng, False)
+	store = NeuralNetwork.BrainStore(os.path.join(directory, "pool"))
+	store.begin()
+	for s in range(size): NeuralNetwork.Brain.clone(brain, rng = rng).saveToStore(store, "brain" + str(s))
+	store.commit()
+	call = lambda: store.brains(lazy = True)
+	call.directory = directory
+	return call
+
+#A fresh child of such a Brain, or a round of mutation of it (as GeneticArena.Manager.fill() would)
+def brainClone(size, rng):
+	brain, directory = brainFile(size, rng, False)
+	shutil.rmtree(directory)
+	return lambda: NeuralNetwork.Brain.clone(brain, rng = rng)
+
+def brainMutate(size, rng):
+	brain, directory = brainFile(size, rng, False)
+	shutil.rmtree(directory)
+	return lambda: brain.mutate(0.05, rng)
+
+#operation : (case, sizes)
+cases = [ \
+("Neuron.feed", lambda size, rng: neuronFeed(size, rng), (4, 16, 64)), \
+("Cortex.feed", lambda size, rng: cortexFeed(size, rng), (4, 16, 64)), \
+("Cortex.back", lambda size, rng: cortexBack(size, rng), (4, 16, 64)), \
+("Cortex.feed.vectorized", lambda size, rng: cortexFeed(size, rng, True), (4, 16, 64)), \
+("Cortex.back.vectorized", lambda size, rng: cortexBack(size, rng, True), (4, 16, 64)), \
+("Cortex.feed.sparse", lambda size, rng: cortexFeed(size, rng, False, 0.25), (16, 64)), \
+("Cortex.back.sparse", lambda size, rng: cortexBack(size, rng, False, 0.25), (16, 64)), \
+("Stimulus.fromDict.Acquire", lambda size, rng: stimulusFromDict("Acquire", size, rng), (1, 4, 16)), \
+("Stimulus.fromDict.Polity", lambda size, rng: stimulusFromDict("Polity", size, rng), (1, 4, 16)), \
+("Brain.feedForward.Acquire", lambda size, rng: brainFeedForward("Acquire", size, rng), (1, 4, 16)), \
+("Brain.feedForward.Polity", lambda size, rng: brainFeedForward("Polity", size, rng), (1, 4, 16)), \
+("Brain.feedBackward.Acquire", lambda size, rng: brainFeedBackward("Acquire", size, rng), (1, 4, 16)), \
+("Brain.feedBackward.Polity", lambda size, rng: brainFeedBackward("Polity", size, rng), (1, 4, 16)), \
+("Brain.saveToPath.text", lambda size, rng: brainSave(size, rng), (1, 8)), \
+("Brain.saveToPath.binary", lambda size, rng: brainSave(size, rng, True), (1, 8)), \
+("Brain.loadFromPath.text", lambda size, rng: brainLoad(size, rng), (1, 8)), \
+("Brain.loadFromPath.binary", lambda size, rng: brainLoad(size, rng, True), (1, 8)), \
+("Brain.loadFromPath.lazy", lambda size, rng: brainLoad(size, rng, False, True), (1, 8)), \
+("Brain.checkpoint.text", lambda size, rng: brainCheckpoint(size, rng), (1, 8)), \
+("Brain.checkpoint.binary", lambda size, rng: brainCheckpoint(size, rng, True), (1, 8)), \
+("Brain.checkpoint.pool", lambda size, rng: brainCheckpoint(size, rng, False, True), (1, 8)), \
+("BrainStore.brains", lambda size, rng: storeBrains(size, rng), (8, 32)), \
+("Brain.clone", lambda size, rng: brainClone(size, rng), (1, 8)), \
+("Brain.mutate", lambda size, rng: brainMutate(size, rng), (1, 8)), \
+]
+
+#Microseconds per call: the best of the repeats, each of enough calls to last about budget seconds
+def measure(call, repeat = 5, budget = 0.05): #float
+	#call : void -> any
+	#repeat : (int)
+	#budget : (float)
+	timer = timeit.Timer(call)
+	number = 1
+	while timer.timeit(number) < budget and number < 1000000: number *= 4
+	return 1e6 * min(timer.repeat(repeat, number)) / float(number)
+
+def run(selected = None, repeat = 5, budget = 0.05, seed = 1): #results dictionary
+	#selected : (string list) --- prefixes of operations to run; all of them if None
+	#repeat : (int)
+	#budget : (float) --- seconds per repeat
+	#seed : (int)
+	results = {}
+	for operation, case, sizes in cases:
+		if selected != None and True not in [operation.startswith(prefix) for prefix in selected]: continue
+		if operation.endswith(".vectorized") and NeuralNetwork.numpy == None: continue
+		for size in sizes:
+			random.seed(seed)
+			call = case(size, random.Random(seed))
+			results[operation + "[" + str(size) + "]"] = round(measure(call, repeat, budget), 3)
+			if hasattr(call, "directory"): shutil.rmtree(call.directory)
+	return { \
+	"meta":{ \
+	"python":platform.python_version(), \
+	"numpy":None if NeuralNetwork.numpy == None else NeuralNetwork.numpy.__version__, \
+	"platform":platform.platform(), \
+	"unit":"microseconds per call" \
+	}, \
+	"results":results \
+	}
+
+#Every operation slower than its baseline by more than the threshold (as a share of the baseline)
+def compare(results, baseline, threshold = 0.25): #(string, float, float) list --- operation, baseline, result
+	#results : results dictionary (cf run(), supra)
+	#baseline : results dictionary
+	#threshold : (float)
+	regressions = []
+	for operation in order(results["results"]):
+		if operation not in baseline["results"]: continue
+		before, after = baseline["results"][operation], results["results"][operation]
+		if after > before * (1.0 + threshold): regressions.append((operation, before, after))
+	return regressions
+
+#Sorts "operation[size]" keys by operation, then by size as a number
+def order(operations): #string list
+	#operations : string list
+	return sorted(operations, key = lambda operation: \
+	(operation[:operation.index("[")], int(operation[operation.index("[") + 1:-1])))
+
+def table(results, baseline = None): #string
+	#results : results dictionary
+	#baseline : (results dictionary)
+	lines = []
+	for operation in order(results["results"]):
+		line = "%-36s %12.2f us" % (operation, results["results"][operation])
+		if baseline != None and operation in baseline["results"]:
+			line += "   (baseline %10.2f us, x%.2f)" % \
+			(baseline["results"][operation], results["results"][operation] / baseline["results"][operation])
+		lines.append(line)
+	return "\n".join(lines)
+
+def load(path): #results dictionary
+	#path : string
+	with open(path, 'r') as store: return json.load(store)
+
+def save(results, path): #void
+	#results : results dictionary
+	#path : string
+	with open(path, 'w') as store: json.dump(results, store, indent = 1, sort_keys = True)
@@ -0,0 +1,5 @@
+#Copyright (c) Hans Andersson 2011
+#All rights reserved.
+
+#Micro-benchmarks for the NeuralNetwork module (cf Suite.py); run from the top directory:
+#   python -m Benchmark [operation prefixes...] [-o=results.json] [-b=baseline.json] [-t=0.25] [-s]
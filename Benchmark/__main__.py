@@ -0,0 +1,69 @@
+#Copyright (c) Hans Andersson 2011
+#All rights reserved.
+
+import os, sys
+from Benchmark import Suite
+
+class OptionError(Exception): pass
+
+### OPTION DEFAULTS
+selected = None
+outputPath = None
+baselinePath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+threshold = 0.25
+saveBaseline = False
+repeat, budget = 5, 0.05
+
+### COMMAND-LINE OPTION/ARGUMENT PARSER
+arguments = sys.argv[1:]
+a = 0
+while a < len(arguments):
+	option = arguments[a]
+	a += 1
+	if option[0] != '-':
+		#anything else selects operations by prefix, e.g. "Brain.feed"
+		selected = (selected or []) + [option]
+		continue
+	
+	while option[0] == '-': option = option[1:]
+	argument = None
+	if ':' in option: option, argument = option.split(':')
+	elif '=' in option: option, argument = option.split('=')
+	if argument == None and option in ('o', "output", 'b', "baseline", 't', "threshold", 'r', "repeat"):
+		if not a < len(arguments): raise OptionError("option '%s' needs an argument" % option)
+		argument = arguments[a]
+		a += 1
+	
+	if option in ('h', '?', "help"):
+		raise SystemExit
+	elif option in ('o', "output"):
+		outputPath = argument
+	elif option in ('b', "baseline"):
+		baselinePath = argument
+	elif option in ('t', "threshold"):
+		threshold = float(argument)
+		assert threshold > 0.0
+	elif option in ('r', "repeat"):
+		repeat = int(argument)
+		assert repeat > 0
+	elif option in ('q', "quick"):
+		repeat, budget = 3, 0.01
+	elif option in ('s', "save"):
+		saveBaseline = True
+	else: raise OptionError("option '%s' unrecognized" % option)
+
+results = Suite.run(selected, repeat, budget)
+if outputPath != None: Suite.save(results, outputPath)
+
+if saveBaseline:
+	Suite.save(results, baselinePath)
+	print(Suite.table(results))
+	raise SystemExit
+
+baseline = Suite.load(baselinePath) if os.path.isfile(baselinePath) else None
+print(Suite.table(results, baseline))
+if baseline != None:
+	regressions = Suite.compare(results, baseline, threshold)
+	for operation, before, after in regressions:
+		print("REGRESSION %s: %.2f us -> %.2f us (threshold %i%%)" % (operation, before, after, int(100 * threshold)))
+	if len(regressions) > 0: raise SystemExit(1)
@@ -18,7 +18,8 @@ class Evaluation:
 	#this class expresses the neural-network - backpropagate-able
 	#difference between two Evaluation instances
 	class Difference:
-		def __init__(self, context, outputsType, targetActivations, otherActivations):
+		def __init__(self, context, outputsType, targetActivations, otherActivations, stimulus = None):
+			#stimulus : (NeuralNetwork.Stimulus) --- of the context, as the other Evaluation passed it through (and taped it)
 			assert type(targetActivations) == type(list())
 			assert type(otherActivations) == type(list())
 			assert len(targetActivations) == len(otherActivations)
@@ -27,6 +28,7 @@ class Evaluation:
 			self.context = context
 			self.outputsType = outputsType
 			self.deltas = [t - o for t, o in zip(targetActivations, otherActivations)]
+			self.stimulus = stimulus
 	
 	def __init__(self, context, outputsType, outputsCount = 1, description = None):
 		#context : recursive float dictionary
@@ -39,14 +41,30 @@ class Evaluation:
 		self.outputsCount = outputsCount
 		self.activations = None
 		self.description = description
+		#the stimuli last taped through a brain (cf through(), infra), in the order of differences()
+		self.stimuli = None
 	
 	#passes the decision through a neural network to set activations
-	def through(self, brain):
+	def through(self, brain, tape = False):
 		#brain : Brain
-		self.activations = brain.feedForward(NeuralNetwork.Stimulus.fromDict(self.context), self.outputsType, self.outputsCount)
+		#tape : (Boolean) --- keeps the stimuli, with their hidden activations, for learning from (cf Interface.AI.learn())
+		stimulus = NeuralNetwork.Stimulus.fromDict(self.context)
+		self.activations = brain.feedForward(stimulus, self.outputsType, self.outputsCount, tape)
 		assert len(self.activations) == self.outputsCount
+		if tape: self.stimuli = [stimulus]
 		return self.activations
 	
+	#passes fresh copies of the decision through every brain of a BrainPopulation at once
+	def throughPopulation(self, population): #Evaluation list, in order of population.brains
+		#population : BrainPopulation
+		copies = []
+		for activations in population.feedForward(NeuralNetwork.Stimulus.fromDict(self.context), self.outputsType, self.outputsCount):
+			copy = self.copyFresh()
+			copy.activations = activations
+			assert len(copy.activations) == copy.outputsCount
+			copies.append(copy)
+		return copies
+	
 	#gets the decision from the console user
 	def fromConsole(self):
 		os.system("printf '%s\n'" % str(self))
@@ -79,7 +97,8 @@ class Evaluation:
 		assert self.outputsType == other.outputsType
 		assert self.selection() != None
 		assert other.selection() != None
-		return [self.__class__.Difference(self.context, self.outputsType, self.activations, other.activations)]
+		return [self.__class__.Difference(self.context, self.outputsType, self.activations, other.activations, \
+		None if other.stimuli == None else other.stimuli[0])]
 	
 	def __str__(self): return "Decision : " + (self.outputsType if self.description == None else self.description)
 
@@ -114,6 +133,7 @@ class Enumeration(Evaluation):
 		self.activations = None
 		self.options = []
 		self.description = description
+		self.stimuli = None
 	
 	#adds an option to the enumeration
 	def option(self, context, outputsType, id = None, description = None): #new Option
@@ -132,12 +152,27 @@ class Enumeration(Evaluation):
 		self.options \
 		)
 	
-	def through(self, brain): #Option with maximum activation
+	def through(self, brain, tape = False): #Option with maximum activation
 		#brain : Brain
-		for option, representation in zip(self.options, self.toDicts()):
-			option.activation = brain.feedForward(NeuralNetwork.Stimulus.fromDict(representation), self.outputsType, 1)[0]
+		#tape : (Boolean) --- cf Evaluation.through()
+		#every representation nests self.context, so share its Stimulus (and its activations)
+		memo = {}
+		stimuli = [NeuralNetwork.Stimulus.fromDict(representation, memo) for representation in self.toDicts()]
+		for option, activations in zip(self.options, brain.feedForwardBatch(stimuli, self.outputsType, 1, tape)):
+			option.activation = activations[0]
+		if tape: self.stimuli = stimuli
 		return self.selection()
 	
+	def throughPopulation(self, population): #Enumeration list, in order of population.brains
+		#population : BrainPopulation
+		copies = [self.copyFresh() for brain in population.brains]
+		memo, populationMemo = {}, {}
+		for o, representation in zip(range(len(self.options)), self.toDicts()):
+			stimulus = NeuralNetwork.Stimulus.fromDict(representation, memo)
+			for copy, activations in zip(copies, population.feedForward(stimulus, self.outputsType, 1, populationMemo)):
+				copy.options[o].activation = activations[0]
+		return copies
+	
 	def fromConsole(self, certainty = 0.95):
 		assert type(certainty) == type(float())
 		assert certainty > 0.5 and not certainty > 1.0
@@ -173,7 +208,8 @@ class Enumeration(Evaluation):
 		assert self.__class__ == other.__class__
 		assert self.outputsType == other.outputsType
 		assert len(self.options) == len(other.options)
-		return [self.__class__.Difference(selfOptionRepresentation, self.outputsType, [selfOption.activation], [otherOption.activation]) for selfOption, otherOption, selfOptionRepresentation in zip(self.options, other.options, self.toDicts())]
+		otherStimuli = [None for option in other.options] if other.stimuli == None else other.stimuli
+		return [self.__class__.Difference(selfOptionRepresentation, self.outputsType, [selfOption.activation], [otherOption.activation], otherStimulus) for selfOption, otherOption, selfOptionRepresentation, otherStimulus in zip(self.options, other.options, self.toDicts(), otherStimuli)]
 	
 	def __str__(self):
 		stringRepresentation = "Decision : " + (self.outputsType if self.description == None else self.description) + "\n"
@@ -192,6 +228,8 @@ class Verification(Evaluation):
 		self.outputsCount = 1
 		self.activations = None
 		self.description = description
+		#cf Evaluation.__init__()
+		self.stimuli = None
 	
 	def fromConsole(self, certainty = 0.95):
 		assert type(certainty) == type(dict())
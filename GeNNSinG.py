@@ -4,7 +4,7 @@
 #All rights reserved.
 
 import os, sys, random, datetime
-import Interface, GeneticArena
+import Interface, GeneticArena, NeuralNetwork
 
 class OptionError(Exception): pass
 
@@ -16,14 +16,19 @@ os.chdir(os.path.dirname(sys.argv[0]) + "/")
 Environment = __import__(environmentName, globals(), locals(), ["Environment"], -1).Environment
 os.chdir(cwd)
 
-#initialize the GeneticArena, which takes care of the genetic algorithm
-arenaManager = GeneticArena.Manager(environmentName)
 countMin, countMax = Environment.getPlayersCountRange()
 
 ### OPTION DEFAULTS
 consoleNames, brainNames = set(), set()
 automatic, compsCount = False, None
 stall, target, iterationsSinceProgress = None, None, 0
+brainsFormat = None
+perturbed = None
+optimizerName, batchSize = None, None
+epochs, tolerance = None, None
+cacheSize = None
+instrument, profilePath = False, None
+pooled, exported = False, False
 
 ### COMMAND-LINE OPTION/ARGUMENT PARSER
 for a in range(len(sys.argv[2:])):
@@ -68,10 +73,72 @@ for a in range(len(sys.argv[2:])):
 			a += 1
 			argument = sys.argv[2:][a]
 		target = int(argument)
+	elif option in ('f', "format"):
+		if argument == None:
+			a += 1
+			argument = sys.argv[2:][a]
+		if argument not in ("text", "binary"): raise OptionError("format '%s' unrecognized" % argument)
+		brainsFormat = argument
+	elif option in ('r', "perturbed", "perturb"):
+		if argument == None:
+			a += 1
+			argument = sys.argv[2:][a]
+		perturbed = float(argument)
+		if perturbed < 0.0 or perturbed > 1.0: raise OptionError("perturbed share %s outside [0, 1]" % argument)
+	elif option in ('o', "optimizer"):
+		if argument == None:
+			a += 1
+			argument = sys.argv[2:][a]
+		if argument not in NeuralNetwork.optimizers: raise OptionError("optimizer '%s' unrecognized" % argument)
+		optimizerName = argument
+	elif option in ('m', "minibatch", "batch"):
+		if argument == None:
+			a += 1
+			argument = sys.argv[2:][a]
+		batchSize = int(argument)
+		assert batchSize > 0
+	elif option in ('e', "epochs"):
+		if argument == None:
+			a += 1
+			argument = sys.argv[2:][a]
+		epochs = int(argument)
+		assert epochs > 0
+	elif option in ('p', "plateau", "tolerance"):
+		if argument == None:
+			a += 1
+			argument = sys.argv[2:][a]
+		tolerance = float(argument)
+		assert not tolerance < 0.0
+	elif option in ('k', "cache"):
+		if argument == None:
+			a += 1
+			argument = sys.argv[2:][a]
+		cacheSize = int(argument)
+		assert cacheSize > 0
+	elif option in ('i', "instrument", "profile"):
+		#optionally, -i=path also saves the profile as JSON
+		instrument, profilePath = True, argument
+	elif option in ('g', "genepool", "store"):
+		#optionally, -g=export also writes the pool file back to a file per brain, at the end
+		if argument not in (None, "export"): raise OptionError("store argument '%s' unrecognized" % argument)
+		pooled, exported = True, argument == "export"
 	else: raise OptionError("option '%s' unrecognized" % option)
 
 os.system("clear")
 
+#initialize the GeneticArena, which takes care of the genetic algorithm
+#   (with the pool file from the start, lest it fill the directory of brain files, cf GeneticArena.Manager.fill())
+arenaManager = GeneticArena.Manager(environmentName, store = pooled)
+if brainsFormat != None: arenaManager.convertPool(brainsFormat == "binary")
+if perturbed != None: arenaManager.perturbed = perturbed
+if optimizerName != None: arenaManager.optimizer = NeuralNetwork.optimizers[optimizerName]()
+arenaManager.batchSize = batchSize
+if epochs != None: arenaManager.epochs = epochs
+if tolerance != None: arenaManager.tolerance = tolerance
+if cacheSize != None: arenaManager.cacheSize = cacheSize
+#every brain loaded from here on records into the one profile (cf NeuralNetwork.Profile)
+if instrument: NeuralNetwork.defaultProfile = NeuralNetwork.Profile()
+
 if compsCount != None:
 	arenaManager.minimumBrainsCount = max(arenaManager.minimumBrainsCount, compsCount)
 	arenaManager.fill()
@@ -149,11 +216,19 @@ else: #INTERACTIVE
 		
 	winner = agentsRanked[0][0]
 	
-	#write a human-readable review for the console player if the AI won
+	#write a human-readable review for the console player if the AI won, with the opinion of every AI (the winner's first),
+	#   all of them at once (cf Interface.IO.consultAll())
 	if isinstance(winner, Interface.AI):
+		opinions = [winner] + [agent for agent, quantifier in agentsRanked[1:] if isinstance(agent, Interface.AI)]
 		for agent in filter(lambda agent: isinstance(agent, Interface.IO), agents):
 			with open("./" + environmentName + "/reviews/" + str(datetime.datetime.now()) + " @ " + agent.name + ".txt", 'w') as annotation:
-				annotation.write(agent.consult(winner))
+				annotation.write(agent.consultAll(opinions))
 	
 	#update the neural networks, even if the console user won
-	arenaManager.teachStudents(winner)
\ No newline at end of file
+	arenaManager.teachStudents(winner)
+
+if exported: arenaManager.exportPool()
+
+if instrument:
+	os.system("printf 'Cortices, by time spent:\n%s\n'" % NeuralNetwork.defaultProfile.table())
+	if profilePath != None: NeuralNetwork.defaultProfile.save(profilePath)
@@ -70,18 +70,43 @@ class Manager:
 				rate *= studentLossesVsTeacher / (studentLossesVsTeacher + studentWinsVsTeacher)
 			return rate
 
-	def __init__(self, gameName, minimumBrainsCount = 10):
+	def __init__(self, gameName, minimumBrainsCount = 10, binary = False, perturbed = 0.25, optimizer = None, batchSize = None, \
+	epochs = 1, tolerance = 0.001, cacheSize = None, store = False):
 		#minimumBrainsCount : optional int
+		#binary : optional Boolean --- the file format for new brains (cf NeuralNetwork.binaryMagic)
+		#perturbed : optional float --- the share of each clone's neurons to perturb (cf NeuralNetwork.Brain.clone());
+		#            the rest stay shared with the parent, so filling the genepool costs about as much as the weights that change
+		#optimizer : optional SGD --- how students step their weights (cf NeuralNetwork.optimizers), at rates scaled to it;
+		#            its state lasts as long as the Manager (cf getStudentForName(), infra)
+		#batchSize : optional int --- how many of the teacher's decisions per step (cf teachStudents(), infra); all if None
+		#epochs : optional int --- how many times at most students go over the teacher's decisions (cf teachStudents(), infra)
+		#tolerance : optional float --- the least relative improvement in loss per epoch for a student to go on
+		#cacheSize : optional int --- how many activations each brain keeps for stimuli it sees again (cf NeuralNetwork.Brain.setCache())
+		#store : optional Boolean --- keeps the genepool in one pool file rather than a file per brain (cf useStore(), infra)
 		self.gameName = gameName
 		self.pathPool = "./" + self.gameName + "/brains/"
+		self.pathStore = "./" + self.gameName + "/brains.pool"
+		self.store = None
+		#students, kept loaded from one generation to the next, if the optimizer keeps state (cf getStudentForName(), infra)
+		self.students = {} #:Brain dictionary, keyed by name
+		if store: self.useStore()
 		self.minimumBrainsCount = minimumBrainsCount
+		self.binary = binary
+		self.perturbed = perturbed
+		self.optimizer = optimizer
+		self.batchSize = batchSize
+		self.epochs = epochs
+		self.tolerance = tolerance
+		self.cacheSize = cacheSize
 		self.fill()
 		self.recordkeeper = self.Recordkeeper(self.gameName)
 
 	### RETRIEVAL OF USABLE BRAINS / AGENTS ###
 	def getNamesUsed(self): #string list --- all the brains in the genepool
 		namesUsed = set()
-		for root, dirs, files in os.walk(self.pathPool): namesUsed |= set(files)
+		if self.store != None: namesUsed = set(self.store.names())
+		else:
+			for root, dirs, files in os.walk(self.pathPool): namesUsed |= set(files)
 		namesPool = set(open("./names", "r").read().strip().split(","))
 		namesExtraneous = namesUsed - namesPool
 		return namesUsed - namesExtraneous
@@ -92,7 +117,30 @@ class Manager:
 	
 	def getBrainForName(self, name): #Brain ||| Brain.path.endsWith(brainName)
 		#brainName : string
-		return NeuralNetwork.Brain(self.pathPool + name)
+		#lazily, since many of these brains only name agents or decide a handful of decisions
+		if self.store != None:
+			return NeuralNetwork.Brain(name, binary = self.binary, lazy = True, optimizer = self.optimizer, \
+			cacheSize = self.cacheSize, store = self.store)
+		return NeuralNetwork.Brain(self.pathPool + name, binary = self.binary, lazy = True, optimizer = self.optimizer, \
+		cacheSize = self.cacheSize)
+	
+	def getOptimizer(self): #SGD
+		return NeuralNetwork.defaultOptimizer if self.optimizer == None else self.optimizer
+	
+	#Students stay loaded across generations, so that the state of their optimizer (cf NeuralNetwork.Neuron.moments),
+	#   which no brain file holds, carries over from one lesson to the next; whatever rewrites their files evicts them
+	#Without such state (e.g. SGD), they load afresh, lest every brain in the genepool stay in memory for nothing
+	def getStudentForName(self, name): #Brain
+		#name : string
+		if not self.getOptimizer().stateful: return self.getBrainForName(name)
+		if name not in self.students: self.students[name] = self.getBrainForName(name)
+		return self.students[name]
+	
+	def getBrainsForNames(self, names): #Brain list, in order of names
+		#names : string set
+		if self.store == None: return [self.getBrainForName(name) for name in names]
+		#in one go, in the order of the pool file
+		return self.store.brains(names, lazy = True, binary = self.binary, optimizer = self.optimizer, cacheSize = self.cacheSize)
 
 	def getAIs(self, count, namesPreferred = set(), namesExcluded = set()): #Agent list
 		#count : int
@@ -109,7 +157,7 @@ class Manager:
 		if len(namesSelected) < count:
 			namesSelected |= set(random.sample(self.getNamesUsed() - (namesPreferred | namesExcluded), count - len(namesSelected)))
 		
-		return set([Interface.AI(self.getBrainForName(name)) for name in namesSelected])
+		return set([Interface.AI(brain) for brain in self.getBrainsForNames(namesSelected)])
 
 	### MANAGEMENT OF PERSISTENT STORE ###
 	def fill(self, example = None): #void --- makes sure the genepool is full
@@ -118,41 +166,118 @@ class Manager:
 		if example == None: self.getAIs(self.minimumBrainsCount)
 		else:
 			assert isinstance(example, Interface.Agent)
-			while len(self.getNamesUsed()) < self.minimumBrainsCount:
-				clone = NeuralNetwork.Brain.clone(example.brain)
-				clone.saveToPath(self.pathPool + random.choice(list(self.getNamesUnused())))
+			if self.store != None:
+				#every clone in one transaction (which the names used only reflect once committed)
+				self.store.begin()
+				for name in random.sample(list(self.getNamesUnused()), max(self.minimumBrainsCount - len(self.getNamesUsed()), 0)):
+					NeuralNetwork.Brain.clone(example.brain, perturbed = self.perturbed).saveToStore(self.store, name)
+				self.store.commit()
+			else:
+				while len(self.getNamesUsed()) < self.minimumBrainsCount:
+					clone = NeuralNetwork.Brain.clone(example.brain, perturbed = self.perturbed)
+					clone.saveToPath(self.pathPool + random.choice(list(self.getNamesUnused())))
+
+	def convertPool(self, binary = True): #void --- migrates every brain in the genepool to the text or binary format
+		#binary : optional Boolean
+		self.binary = binary
+		self.students = {}
+		if self.store == None: return NeuralNetwork.convertPath(self.pathPool, binary)
+		self.store.begin()
+		for brain in self.store.brains():
+			if brain.binary != binary:
+				brain.binary = binary
+				brain.save()
+		self.store.commit()
+	
+	#Moves the genepool into one pool file (cf NeuralNetwork.BrainStore), importing the brain files the first time
+	#The files stay as they were, until exportPool() overwrites them
+	def useStore(self): #void
+		if self.store != None: return
+		self.store = NeuralNetwork.BrainStore(self.pathStore)
+		self.students = {}
+		if len(self.store.names()) == 0 and os.path.isdir(self.pathPool): self.store.importPath(self.pathPool)
+	
+	def exportPool(self): #void --- writes every brain in the pool file back to a file of its own
+		if self.store != None: self.store.export(self.pathPool)
 
 	def kill(self, target): #void --- adversarial selection
 		#target : Agent
 		assert isinstance(target, Interface.Agent)
-		os.remove(target.brain.path)
+		self.students.pop(target.name, None)
+		if self.store != None: self.store.drop(target.brain.path)
+		else:
+			os.remove(target.brain.path)
+			if os.path.isfile(target.brain.path + NeuralNetwork.journalSuffix): os.remove(target.brain.path + NeuralNetwork.journalSuffix)
 		os.remove(self.recordkeeper.getRecordPathForAgent(target))
 	
 	### UPDATING PERSISTENT ENTITIES ###
-	def teachStudents(self, teacher, students = None): #void --- updates Brain instances based on learning rate (supra)
+	#Students go over the teacher's decisions epoch after epoch, each one until its loss plateaus
+	#   (improving on the previous epoch by less than the tolerance, relative to it) or the epochs run out
+	def teachStudents(self, teacher, students = None, batchSize = None, epochs = None, tolerance = None): #(float list) dictionary --- each student's loss per epoch, by name
 		#teacher : Agent
 		#students : Agent set
+		#batchSize : optional int --- steps every student after each batchSize decisions (mini-batches); defaults to self.batchSize
+		#epochs : optional int --- defaults to self.epochs
+		#tolerance : optional float --- defaults to self.tolerance
 		
 		#default to all existing Brain stores
-		if students == None: students = [Interface.AI(brain) for brain in [self.getBrainForName(name) for name in self.getNamesUsed()]]
+		if students == None: students = [Interface.AI(self.getStudentForName(name)) for name in self.getNamesUsed()]
+		if batchSize == None: batchSize = self.batchSize
+		if epochs == None: epochs = self.epochs
+		if tolerance == None: tolerance = self.tolerance
+		assert batchSize == None or batchSize > 0
+		assert epochs > 0
+		#the same targets every epoch
+		decisionsClarified = [decision.clarified() for decision in teacher.decisions]
+		losses = dict([(student.name, []) for student in students])
+		plateaued = set() #:string set --- names
+		#students still learning, with their rates (scaled from SGD's to the optimizer's, cf NeuralNetwork.SGD.rateScale)
+		scale = self.getOptimizer().rateScale
+		learning = [(student, scale * self.recordkeeper.computeLearningRate(teacher, student)) for student in students]
 		
-		os.system("printf '\tReflect... 000'")
-		done = 0.0
-		for decision in teacher.decisions:
-			decisionClarified = decision.clarified()
-			for student in students: student.learn(decisionClarified)
-			done += 1.0
-			os.system("printf '\b\b\b%s'" % str(int(100.0 * done/float(len(teacher.decisions)))).zfill(3))
-		os.system("printf '\n'")
+		for epoch in range(epochs):
+			if len(learning) == 0: break
+			os.system("printf '\tReflect%s... 000'" % ("" if epochs == 1 else " " + str(epoch + 1)))
+			totals = [0.0 for student, rate in learning]
+			done = 0.0
+			for decisionClarified in decisionsClarified:
+				#each student decides on tape, so that backing the differences needn't feed them forward again (cf Interface.AI.learn())
+				for s, (student, rate) in zip(range(len(learning)), learning):
+					totals[s] += student.learn(decisionClarified)
+				done += 1.0
+				#a full mini-batch: step now, so that the next decisions see the updated weights
+				if batchSize != None and int(done) % batchSize == 0 and done < len(decisionsClarified):
+					for student, rate in learning: student.brain.update(rate)
+				os.system("printf '\b\b\b%s'" % str(int(100.0 * done/float(len(decisionsClarified)))).zfill(3))
+			for student, rate in learning: student.brain.update(rate)
+			os.system("printf '\n'")
+			
+			#the loss of an epoch is that of the weights as they went into each decision
+			stillLearning = []
+			for (student, rate), total in zip(learning, totals):
+				history = losses[student.name]
+				history.append(total / float(max(len(decisionsClarified), 1)))
+				if len(history) < 2 or history[-2] - history[-1] > tolerance * history[-2]: stillLearning.append((student, rate))
+				else: plateaued.add(student.name)
+			learning = stillLearning
+		
+		for student in students:
+			history = losses[student.name]
+			os.system("printf '\tLoss... %s: %s%s\n'" % (student.name, " > ".join(["%.4f" % loss for loss in history]), \
+			" (plateaued)" if student.name in plateaued else ""))
 		
 		os.system("printf '\tImprint... 000'")
 		done = 0.0
+		#only the neurons that learned anything, appended to each brain's journal (cf NeuralNetwork.Brain.checkpoint()),
+		#   or else every student in one transaction of the pool file
+		if self.store != None: self.store.begin()
 		for student in students:
-			student.brain.update(self.recordkeeper.computeLearningRate(teacher, student))
-			student.brain.save()
+			student.brain.checkpoint()
 			done += 1.0
 			os.system("printf '\b\b\b%s'" % str(int(100.0 * done/float(len(students)))).zfill(3))
+		if self.store != None: self.store.commit()
 		os.system("printf '\n'")
+		return losses
 	
 	def updateWinnersLosers(self, winners, losers, agentsCount = None): #void --- update the competitive records
 		#winners : Agent set
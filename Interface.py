@@ -53,6 +53,19 @@ class IO(Agent):
 			self.name + " : " + str(decision.clarified().selection()) + "\n" + \
 			other.name + " : " + str(secondOpinion.clarified().selection()) + "\n\n"
 		return review
+	
+	#like consult(), supra, but asks every AI at once (cf NeuralNetwork.BrainPopulation)
+	def consultAll(self, others):
+		#others : AI list
+		for other in others: assert isinstance(other, AI)
+		population = NeuralNetwork.BrainPopulation([other.brain for other in others])
+		review = ""
+		for decision in self.decisions:
+			review += str(decision) + "\n" + self.name + " : " + str(decision.clarified().selection()) + "\n"
+			for other, secondOpinion in zip(others, decision.throughPopulation(population)):
+				review += other.name + " : " + str(secondOpinion.clarified().selection()) + "\n"
+			review += "\n"
+		return review
 
 class AI(Agent):
 	def __init__(self, brain):
@@ -66,14 +79,22 @@ class AI(Agent):
 		self.decisions.append(decision)
 		return decision.through(self.brain)
 	
-	def learn(self, decisionTarget): #perspective, outputsType, targets): #void --- updates Brain
+	def learn(self, decisionTarget): #perspective, outputsType, targets): #float --- backs updates into Brain, then returns the loss
 		#decisionClarified : Evaluation
+		#the loss is the mean squared difference between the target activations and the actual ones (before the update)
 		decisionActual = decisionTarget.copyFresh()
-		decisionActual.through(self.brain)
+		#taped, so that feedBackward() needn't feed any of it forward again (cf NeuralNetwork.Brain.feedForward())
+		decisionActual.through(self.brain, True)
+		#differences share sub-contexts (e.g. an Enumeration's context), so share their stimuli
+		memo = {}
+		squares, count = 0.0, 0
 		for difference in \
 		decisionTarget.differences(decisionActual):
 			self.brain.feedBackward( \
 			difference.deltas, \
 			difference.outputsType, \
-			NeuralNetwork.Stimulus.fromDict(difference.context) \
-			)
\ No newline at end of file
+			difference.stimulus if difference.stimulus != None else NeuralNetwork.Stimulus.fromDict(difference.context, memo) \
+			)
+			squares += sum([delta * delta for delta in difference.deltas])
+			count += len(difference.deltas)
+		return squares / float(count) if count > 0 else 0.0
\ No newline at end of file
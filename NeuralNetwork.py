@@ -1,10 +1,14 @@
 #Copyright (c) Hans Andersson 2011
 #All rights reserved.
 
-import random, math, os
+import random, math, os, struct, mmap, sys, time, json, zlib
+from array import array
+from operator import mul, itemgetter
+from collections import OrderedDict
 
-try: from functools import reduce
-except ImportError: reduce = reduce
+#numpy is optional; without it, every Cortex runs in its scalar (per-neuron) mode
+try: import numpy
+except ImportError: numpy = None
 
 #####################################
 ### NEURAL NETWORK IMPLEMENTATION ###
@@ -12,14 +16,153 @@ except ImportError: reduce = reduce
 
 #This module provides the abstract, low-level framework for a neural network
 
+#Stimuli are validated once, as they enter a Brain (cf Stimulus.validate(), infra);
+#   past that boundary, cortices and neurons trust their inputs
+#Debug mode (e.g. while writing an environment): set NeuralNetwork.debug = True
+#   to have every neuron re-check every input, too
+debug = False
+
 #Nonlinear activation function (over a linear combination of inputs)
+#Only ever exponentiates non-positive values, so it can't overflow, however large the magnitude
 def sigmoid(value, multiplier = 1.0): #float on [0.0, 1.0]
 	#value : float
-	e = 1/(1 + math.exp(-value * multiplier))
-	return max(min(e, 1.0), 0.0)
+	value *= multiplier
+	if value < 0.0:
+		e = math.exp(value)
+		return e / (1.0 + e)
+	return 1.0 / (1.0 + math.exp(-value))
+
+#Same as sigmoid(), supra, but elementwise over a numpy array
+def sigmoidArray(values, multiplier = 1.0): #numpy array on [0.0, 1.0]
+	#values : numpy array
+	e = numpy.exp(-numpy.abs(values * multiplier))
+	return numpy.where(values * multiplier < 0.0, e, 1.0) / (1.0 + e)
+
+#ACTIVATIONS --- pluggable per Brain (cf Brain.setActivation(), infra)
+#Each offers a scalar form (for per-neuron feeding) and a vector form (for numpy arrays)
+#Backpropagation takes the derivative from the activation itself, so each must be a sigmoid
+
+#The exact sigmoid
+class Sigmoid:
+	def scalar(self, value): return sigmoid(value) #float on [0.0, 1.0]
+	
+	def vector(self, values): return sigmoidArray(values) #numpy array on [0.0, 1.0]
+
+#Shared by default, so that cortices of different brains batch together (cf BrainPopulation, infra)
+defaultActivation = Sigmoid()
+
+#The sigmoid, interpolated linearly from a table over [-bound, bound] (and saturated beyond)
+#Interpolation errs by at most (step ** 2) / 8 * max|sigmoid''| < 0.0121 * step ** 2,
+#   and saturation by at most sigmoid(-bound)
+class LookupSigmoid(Sigmoid):
+	def __init__(self, bound = 16.0, resolution = 64):
+		#bound : (float)
+		#resolution : (int) --- table entries per unit, i.e. step = 1.0 / resolution
+		assert bound > 0.0 and resolution > 0
+		self.bound = float(bound)
+		self.resolution = float(resolution)
+		self.last = int(2.0 * self.bound * self.resolution)
+		self.table = [sigmoid(-self.bound + float(i) / self.resolution) for i in range(self.last + 1)]
+		self.tableArray = numpy.array(self.table) if numpy != None else None
+	
+	#The guaranteed bound on the deviation from sigmoid() (cf the class comment, supra)
+	def errorBound(self): #float
+		return max(0.0121 / (self.resolution ** 2), sigmoid(-self.bound))
+	
+	def scalar(self, value): #float on [0.0, 1.0]
+		position = (value + self.bound) * self.resolution
+		if not position > 0.0: return self.table[0]
+		if not position < self.last: return self.table[self.last]
+		i = int(position)
+		return self.table[i] + (position - i) * (self.table[i + 1] - self.table[i])
+	
+	def vector(self, values): #numpy array on [0.0, 1.0]
+		#clipped before scaling, lest huge magnitudes overflow
+		positions = (numpy.clip(values, -self.bound, self.bound) + self.bound) * self.resolution
+		indices = numpy.minimum(positions.astype(int), self.last - 1)
+		lower = self.tableArray[indices]
+		return lower + (positions - indices) * (self.tableArray[indices + 1] - lower)
+
+#Text brain files (and journals, cf journalMagic, infra) hold a line per neuron: signature tab weights,
+#   the weights joined by "|" (cf Neuron.__str__(), infra)
+#Signatures may start with a space (e.g. " -> 1/1", for stimuli without keys), so only line breaks get stripped
+def parseLines(text): #(string list) list --- signature & the text of the weights, per line
+	#text : string
+	records = [line.split("\t") for line in text.splitlines()]
+	assert False not in [len(record) == 2 for record in records]
+	return records
+
+def parseWeights(text): #float list
+	#text : string
+	return [float(w) for w in text.split("|")]
+
+#Binary brain files (cf Brain.saveToPath(), infra) hold a header, an index of signatures,
+#   and then every weight as one contiguous float64 block, neuron after neuron:
+#   magic | version : uint32 | neurons count : uint32 | weights count : uint64
+#   per neuron: signature length : uint32 | signature : utf-8 | weights count : uint32
+#   zero padding to a multiple of 8 bytes | weights : little-endian float64
+binaryMagic = b"GNNB"
+binaryVersion = 1
+
+#Journals (cf Brain.checkpoint(), infra) sit beside brain files, appending only the neurons that changed:
+#   a header line, "GNND" tab stamp of the brain file (cf fileStamp(), infra), then one block per checkpoint:
+#   per changed neuron: signature tab weights (as in text brain files)
+#   "=" tab records count tab CRC-32 of the block's records
+#Loading replays the complete blocks over the file, the last record of a neuron winning; a block cut short
+#   (e.g. by a crash) gets dropped, and a journal stamped for another version of the file gets ignored
+journalMagic = "GNND"
+journalSuffix = ".delta"
+temporarySuffix = ".tmp"
+
+#Pool files (cf BrainStore, infra) hold many brains, each the content of a brain file under a name:
+#   magic | version : uint32, then records, appended one transaction after another:
+#   kind : 1 byte | name length : uint32 | payload length : uint64 | CRC-32 of name and payload : uint32
+#   name : utf-8 | payload
+#Kinds: "P" puts the payload (a brain file, text or binary) under the name, "D" drops the name (no payload),
+#   "J" journals the neurons of the brain under the name that changed (as the records of a journal block, cf journalMagic, supra),
+#   "C" commits the records before it since the last commit (no name, no payload: the length is their count)
+#A transaction's records are on disk before its commit is written, so whatever follows the last commit can go
+poolMagic = b"GNNP"
+poolVersion = 1
+poolRecord = "<cIQI"
+
+#Tells versions of a file apart: replacing a file (cf Brain.saveToPath(), infra) always changes the inode
+def fileStamp(path): #string
+	#path : string
+	status = os.stat(path)
+	return "%i:%i:%i" % (status.st_ino, status.st_size, status.st_mtime_ns)
+
+#Converts a brain file, or every brain file in a directory, to the text or the binary format
+def convertPath(path, binary = True): #void
+	#path : string
+	#binary : (Boolean)
+	assert type(path) == type(str())
+	if os.path.isdir(path):
+		for root, dirs, files in os.walk(path):
+			for name in files:
+				#journals go along with their files (cf journalMagic, infra)
+				if not name.startswith(".") and not name.endswith((journalSuffix, temporarySuffix)):
+					convertPath(os.path.join(root, name), binary)
+		return
+	brain = Brain(path)
+	if brain.binary != binary:
+		brain.binary = binary
+		brain.save()
 
 #A signature for messages passed through the neural network
 class Signature:
+	#Kinds are interned as int ids, so that hot lookups (cf Brain.cortexForKeys()) never format strings
+	ids = {} #:int dictionary, keyed by kind
+	kinds = [] #:string list, indexed by id
+	
+	@classmethod
+	def intern(self, kind): #int
+		#kind : string
+		if kind not in self.ids:
+			self.ids[kind] = len(self.kinds)
+			self.kinds.append(kind)
+		return self.ids[kind]
+	
 	def __init__(self, kind, dimensions):
 		#kind : string
 		#dimensions : int
@@ -31,64 +174,409 @@ class Signature:
 #Like a dictionary, although ordered and with the intention of immutability
 class Stimulus:
 	@classmethod
-	def fromDict(self, dictionary): #Stimulus
+	def fromDict(self, dictionary, memo = None): #Stimulus
 		#dictionary : recursive float dictionary
-		keys = []
-		sources = []
-		for key, value in zip(dictionary.keys(), dictionary.values()):
-			keys.append(key)
-			if type(value) == type(float()):
-				sources.append([value])
-			elif type(value) == type(list()):
-				for component in value:
-					if type(component) != type(float()):
-						raise TypeError("Value for key '%s' contains non-float component" % key)
-				sources.append(value)
-			else:
-				if type(value) != type(dict()):
-					raise TypeError("Type of value for key '%s' unhandled" % key)
-				sources.append(self.fromDict(value))
-		return self(keys, sources)
+		#memo : (list dictionary) --- pass the same one for every dictionary of a single decision
+		#       so that sub-dictionaries they share (by identity) become one shared Stimulus
+		flat = []
+		shared = None if memo == None else []
+		layout = Layout.forShape(Layout.shapeOf(dictionary, flat, memo, shared))
+		assert len(flat) == layout.dimensions
+		return layout.slice(flat, 0, None if shared == None else iter(shared))
 
-	def __init__(self, keys, sources):
+	def __init__(self, keys, sources, values = None, keyIds = None):
 		#keys : string list
 		#sources : (float list | Stimulus) list
+		#values : ((float list | None) list) --- trusted as given, e.g. when a Layout built the sources
+		#keyIds : (int tuple) --- the interned keys (cf Signature.intern()), e.g. as a Layout compiled them
 		self.keys = keys
-		self.values = []
-		for source in sources:
-			if type(source) == type(list()):
-				for component in source: assert type(component) == type(float())
-				self.values.append(source)
-			else:
-				assert type(source) == type(self)
-				assert source.__class__ == self.__class__
-				#Evaluate only later when passing through the neural network
-				self.values.append(None)
+		self.keyIds = tuple([Signature.intern(key) for key in keys]) if keyIds == None else keyIds
+		if values == None:
+			values = []
+			for source in sources:
+				#the components themselves are checked once, on entering a Brain (cf validate(), infra)
+				if type(source) == type(list()):
+					values.append(source)
+				else:
+					assert type(source) == type(self)
+					assert source.__class__ == self.__class__
+					#Evaluate only later when passing through the neural network
+					values.append(None)
+		self.values = values
 		self.sources = sources
+		#all the inputs as one list, whenever no source is a Stimulus (cf Layout.slice(), infra)
+		self.flat = None
+		#outputs already computed for this Stimulus, keyed by outputsType (cf Brain.feedForward())
+		#shared sub-stimuli thus pass through their cortex only once per decision
+		self.activations = {}
+		#the hidden activations behind each of those outputs, if recorded (cf Brain.feedForward(), feedBackward())
+		self.tape = None #:(float list) dictionary, keyed likewise
+		self.validated = False
+		#the content, as last digested (cf digest(), infra)
+		self.digested = None #:(int, tuple)
+	
+	#Checks every input float once, recursively, at the boundary of the network (cf Brain.feedForward())
+	def validate(self): #void
+		if self.validated: return
+		for source in self.sources:
+			if type(source) == type(list()): checkStimuli(source)
+			elif source.__class__ == self.__class__: source.validate()
+			else: raise TypeError("Source of type other than list or Stimulus")
+		self.validated = True
+	
+	#The kinds and (validated) inputs of this Stimulus, recursively, each input rounded to the nearest 1/resolution
+	#Stimuli of equal digests pass through a Brain alike, to within the rounding (cf Brain.setCache())
+	def digest(self, resolution): #hashable tuple
+		#resolution : int
+		if self.digested != None and self.digested[0] == resolution: return self.digested[1]
+		if self.flat != None: content = tuple([int(value * resolution + 0.5) for value in self.flat])
+		else:
+			content = tuple([tuple([int(value * resolution + 0.5) for value in source]) if type(source) == type(list()) \
+			else source.digest(resolution) for source in self.sources])
+		self.digested = (resolution, (self.keyIds, content))
+		return self.digested[1]
 
+#A compiled plan for turning every dictionary of one shape into a Stimulus
+#The shape is the tree of keys plus the dimensions of each value (cf shapeOf(), infra)
+#Dictionaries of one shape all flatten to one float list, of which each Stimulus takes a slice
+class Layout:
+	plans = {} #:Layout dictionary, keyed by shape
+	
+	#Walks the dictionary once, both to find its shape and to flatten its values (depth first)
+	@classmethod
+	def shapeOf(self, dictionary, flat, memo = None, shared = None): #(string, None | int | tuple) tuple
+		#dictionary : recursive float dictionary
+		#flat : float list
+		#memo : (list dictionary) --- [dictionary, shape, flat, start, stop, Stimulus] by id(dictionary)
+		#shared : (list list) --- collects the memo entries in walk order (cf slice(), infra)
+		shape = []
+		for key, value in dictionary.items():
+			valueType = type(value)
+			if valueType is float:
+				flat.append(value)
+				shape.append((key, None))
+			elif valueType is list:
+				flat.extend(value)
+				shape.append((key, len(value)))
+			elif valueType is dict and memo == None:
+				shape.append((key, self.shapeOf(value, flat)))
+			elif valueType is dict:
+				#a shared sub-dictionary is walked only the first time
+				if id(value) in memo:
+					entry = memo[id(value)]
+					flat.extend(entry[2][entry[3]:entry[4]])
+					shared.append(entry)
+				else:
+					entry = [value, None, flat, len(flat), None, None]
+					memo[id(value)] = entry
+					shared.append(entry)
+					entry[1] = self.shapeOf(value, flat, memo, shared)
+					entry[4] = len(flat)
+				shape.append((key, entry[1]))
+			else:
+				raise TypeError("Type of value for key '%s' unhandled" % key)
+		return tuple(shape)
+	
+	@classmethod
+	def forShape(self, shape): #Layout
+		#shape : (string, None | int | tuple) tuple
+		if shape not in self.plans: self.plans[shape] = self(shape)
+		return self.plans[shape]
+	
+	def __init__(self, shape):
+		#shape : (string, None | int | tuple) tuple --- cf shapeOf(), supra
+		self.shape = shape
+		self.keys = [key for key, kind in shape]
+		self.keyIds = tuple([Signature.intern(key) for key in self.keys])
+		self.kinds = [] #:(None | int | Layout) list --- None for a single float
+		self.slices = [] #:(int, int) list --- offsets of each value within the flat list
+		self.dimensions = 0
+		for key, kind in shape:
+			if type(kind) == type(tuple()): kind = self.__class__(kind)
+			dimensions = 1 if kind == None else (kind if type(kind) == type(int()) else kind.dimensions)
+			self.kinds.append(kind)
+			self.slices.append((self.dimensions, self.dimensions + dimensions))
+			self.dimensions += dimensions
+		self.nested = [isinstance(kind, Layout) for kind in self.kinds]
+		self.flat = True not in self.nested
+	
+	#Builds the Stimulus for flat[offset:offset + self.dimensions]
+	def slice(self, flat, offset, shared = None): #Stimulus
+		#flat : float list
+		#offset : int
+		#shared : (list iterator) --- the memo entries from shapeOf(), supra, consumed in the same order
+		if self.flat:
+			sources = [flat[offset + start:offset + stop] for start, stop in self.slices]
+			stimulus = Stimulus(self.keys, sources, sources, self.keyIds)
+			stimulus.flat = flat[offset:offset + self.dimensions]
+			return stimulus
+		sources, values = [], []
+		for kind, nested, (start, stop) in zip(self.kinds, self.nested, self.slices):
+			if nested and shared == None:
+				sources.append(kind.slice(flat, offset + start))
+				values.append(None)
+			elif nested:
+				entry = next(shared)
+				if entry[5] == None: entry[5] = kind.slice(flat, offset + start, shared)
+				sources.append(entry[5])
+				values.append(None)
+			else:
+				sources.append(flat[offset + start:offset + stop])
+				values.append(sources[-1])
+		return Stimulus(self.keys, sources, values, self.keyIds)
+
+#The strict checks on a list of inputs to the network
+def checkStimuli(stimuli): #void
+	#stimuli : float list
+	if type(stimuli) != type(list()):
+		raise TypeError("Stimuli of type other than list")
+	for stimulus in stimuli:
+		if type(stimulus) != type(float()):
+			raise TypeError("Stimulus of type other than float")
+		elif stimulus > 1.0 or stimulus < 0.0:
+			raise ValueError("Stimulus outside range")
+
+#OPTIMIZERS --- pluggable per Brain (cf Brain.setOptimizer(), infra)
+#Each takes a neuron's mean backed update (the direction that reduces its error) and the learning rate,
+#   then steps the neuron's weights in place; any state it keeps lives on the neuron (cf Neuron.moments, infra)
+
+#Plain (stochastic) gradient descent
+class SGD:
+	#whether it keeps state on the neurons (cf Neuron.moments), which lasts only as long as their brain stays loaded
+	stateful = False
+	#what to scale rates meant for SGD by (e.g. GeneticArena.Manager's), for steps of about the same size
+	rateScale = 1.0
+	
+	def step(self, neuron, updates, rate): #void
+		#neuron : Neuron --- already owning its weights (cf Neuron.own())
+		#updates : float list
+		#rate : float
+		weights = neuron.weights
+		for w in range(len(weights)): weights[w] += rate * updates[w]
+
+#Gradient descent with momentum: steps along a decaying sum of past updates
+class Momentum(SGD):
+	stateful = True
+	
+	def __init__(self, momentum = 0.9):
+		#momentum : (float) --- the share of the previous velocity that carries over
+		assert not momentum < 0.0 and momentum < 1.0
+		self.momentum = momentum
+		#steady updates build up a velocity of 1 / (1 - momentum) steps
+		self.rateScale = 1.0 - momentum
+	
+	def step(self, neuron, updates, rate): #void
+		if neuron.moments == None: neuron.moments = array("d", bytes(8 * len(updates)))
+		weights, velocity = neuron.weights, neuron.moments
+		for w in range(len(weights)):
+			velocity[w] = self.momentum * velocity[w] + rate * updates[w]
+			weights[w] += velocity[w]
+
+#RMSProp: scales each weight's step by a decaying root mean square of its updates
+#Its steps come to about the rate itself, whatever the size of the updates, where SGD's come to the rate times updates
+#   that average under 0.001 (over the decisions of Acquire games), hence its rate scale
+class RMSProp(SGD):
+	stateful = True
+	rateScale = 0.001
+	
+	def __init__(self, decay = 0.9, epsilon = 1e-8):
+		#decay : (float)
+		#epsilon : (float) --- keeps weights that have seen no updates from dividing by zero
+		assert not decay < 0.0 and decay < 1.0
+		self.decay = decay
+		self.epsilon = epsilon
+	
+	def step(self, neuron, updates, rate): #void
+		if neuron.moments == None: neuron.moments = array("d", bytes(8 * len(updates)))
+		weights, squares = neuron.weights, neuron.moments
+		for w in range(len(weights)):
+			squares[w] = self.decay * squares[w] + (1.0 - self.decay) * updates[w] * updates[w]
+			weights[w] += rate * updates[w] / (math.sqrt(squares[w]) + self.epsilon)
+
+#Adam: momentum and RMSProp together, with their bias at the first steps corrected (and RMSProp's rate scale)
+class Adam(SGD):
+	stateful = True
+	rateScale = 0.001
+	
+	def __init__(self, beta1 = 0.9, beta2 = 0.999, epsilon = 1e-8):
+		#beta1 : (float) --- decay of the mean of the updates
+		#beta2 : (float) --- decay of the mean of their squares
+		#epsilon : (float)
+		assert not beta1 < 0.0 and beta1 < 1.0
+		assert not beta2 < 0.0 and beta2 < 1.0
+		self.beta1 = beta1
+		self.beta2 = beta2
+		self.epsilon = epsilon
+	
+	def step(self, neuron, updates, rate): #void
+		#moments : count of steps, then the means, then the mean squares
+		count = len(updates)
+		if neuron.moments == None: neuron.moments = array("d", bytes(8 * (1 + 2 * count)))
+		weights, moments = neuron.weights, neuron.moments
+		moments[0] += 1.0
+		correction1 = 1.0 - self.beta1 ** moments[0]
+		correction2 = 1.0 - self.beta2 ** moments[0]
+		for w in range(count):
+			moments[1 + w] = self.beta1 * moments[1 + w] + (1.0 - self.beta1) * updates[w]
+			moments[1 + count + w] = self.beta2 * moments[1 + count + w] + (1.0 - self.beta2) * updates[w] * updates[w]
+			weights[w] += rate * (moments[1 + w] / correction1) / (math.sqrt(moments[1 + count + w] / correction2) + self.epsilon)
+
+#Shared by default, like defaultActivation (supra); SGD keeps no state
+defaultOptimizer = SGD()
+
+optimizers = {"sgd":SGD, "momentum":Momentum, "rmsprop":RMSProp, "adam":Adam}
+
+#All the weights of a Brain, end to end in one typed array; each of its neurons knows the offset and length of its stretch
+#   (and views it only when asked for its weights, cf Neuron.getWeights(), infra)
+#Appending grows the array by doubling, so a Brain built neuron by neuron copies each weight
+#   a constant number of times (amortized); loads then trim() the spare capacity
+#The array never resizes in place, lest it break the views (and numpy arrays, cf Cortex.getMatrices()) upon it
+#Neurons that move (cf Neuron.own()) or leave the Brain leave their old stretch behind, until compact()
+class WeightBuffer:
+	minimumCapacity = 64
+	
+	def __init__(self, typecode = "d"):
+		#typecode : (string) --- cf Brain.__init__()
+		self.typecode = typecode
+		self.data = array(typecode)
+		self.view = memoryview(self.data)
+		self.size = 0
+		#the count of weights left behind by neurons that moved (cf Brain.compact())
+		self.garbage = 0
+		#counts reallocations, so that whatever keeps views of self.data can tell that they've gone stale
+		self.generation = 0
+	
+	#Copies the weights to the end of the buffer and points the neuron at them
+	def append(self, neuron, weights): #void
+		#neuron : Neuron
+		#weights : float list | float array
+		self.extend([neuron], [len(weights)], weights)
+	
+	#Copies the weights of several neurons, end to end, in one go
+	def extend(self, neurons, counts, weights): #void
+		#neurons : Neuron list
+		#counts : int list --- the count of weights of each neuron, in order
+		#weights : float list | float array | numpy array --- all of theirs
+		count = len(weights)
+		assert sum(counts) == count
+		if self.size + count > len(self.data): self.grow(self.size + count)
+		#lists, and arrays of another typecode, take a conversion first
+		if type(weights) == type(list()) or memoryview(weights).format != self.typecode: weights = array(self.typecode, weights)
+		self.view[self.size:self.size + count] = weights
+		for neuron, count in zip(neurons, counts):
+			if neuron.buffer is self and neuron.offset != None: self.garbage += neuron.length
+			neuron.buffer, neuron.offset, neuron.length, neuron.private = self, self.size, count, None
+			self.size += count
+	
+	def grow(self, size): #void
+		#size : int --- the least the capacity must then be
+		capacity = max(len(self.data), self.minimumCapacity)
+		while capacity < size: capacity *= 2
+		data = array(self.typecode, bytes(self.data.itemsize * capacity))
+		view = memoryview(data)
+		view[:self.size] = self.view[:self.size]
+		self.data, self.view = data, view
+		self.generation += 1
+	
+	#Drops the capacity beyond the weights (e.g. what doubling left over once a load has filled the buffer)
+	def trim(self): #void
+		if len(self.data) == self.size: return
+		self.data = self.data[:self.size]
+		self.view = memoryview(self.data)
+		self.generation += 1
+	
+	#Copies the weights of the given neurons (those viewing this buffer) into a fresh array, in order, without gaps
+	#A neuron's new stretch is its own, even if another Brain still views its old one (cf Brain.clone())
+	def compact(self, neurons): #void
+		#neurons : Neuron list
+		neurons = [neuron for neuron in neurons if neuron.buffer is self and neuron.offset != None]
+		size = sum([neuron.length for neuron in neurons])
+		data = array(self.typecode, bytes(self.data.itemsize * size))
+		view = memoryview(data)
+		offset = 0
+		for neuron in neurons:
+			count = neuron.length
+			view[offset:offset + count] = self.view[neuron.offset:neuron.offset + count]
+			neuron.offset = offset
+			neuron.shared = False
+			offset += count
+		self.data, self.view, self.size = data, view, offset
+		self.garbage = 0
+		self.generation += 1
+
+#Weights live in flat typed arrays rather than lists of boxed floats:
+#   8 bytes per weight as "d" (float64), or 4 as "f" (float32, cf Brain.__init__())
+#A Brain's neurons keep their weights in its WeightBuffer (supra); neurons on their own hold an array each
 class Neuron:
-	def __init__(self, weights): #remember to start with the constant intercept!!
-		#weights : float list
-		self.weights = [w for w in weights]
-		#self.backs caches backpropagated values for batch updates
-		self.backs = []
+	__slots__ = ("private", "shared", "backs", "backsCount", "moments", "buffer", "offset", "length")
+	
+	def __init__(self, weights, view = False, typecode = "d", buffer = None): #remember to start with the constant intercept!!
+		#weights : float list | float array
+		#view : (Boolean) --- keeps the weights as given (e.g. read-only, from a mapped file) rather than copying them
+		#typecode : (string) --- of the array to copy the weights into
+		#buffer : (WeightBuffer) --- to copy the weights into (now, or once written to, if a view; cf own(), infra)
+		self.buffer = buffer
+		#where the weights start in the buffer, and how many there are, if they're there
+		self.offset = None
+		self.length = 0
+		if view: self.private = weights
+		elif buffer != None: buffer.append(self, weights)
+		else: self.private = array(typecode, weights)
+		#whether other neurons (e.g. in cloned brains) might hold the same weights (cf own(), infra)
+		self.shared = False
+		#self.backs sums backpropagated values for batch updates, in one float64 array shaped like the weights
+		#   (a numpy array, if a vectorized cortex backed first; hence "is None", infra),
+		#   and self.backsCount counts them (cf update(), infra)
+		#   (None until the first one, since most neurons of most brains never learn)
+		self.backs = None
+		self.backsCount = 0
+		#whatever state the optimizer keeps for this neuron (cf Momentum, Adam, etc., supra), likewise
+		self.moments = None
+	
+	#A view of the neuron's stretch of the buffer, fresh each time (so that it never holds up the buffer growing),
+	#   or else the array (or view) it holds itself
+	def getWeights(self): #float array | float memoryview
+		if self.offset == None: return self.private
+		return self.buffer.view[self.offset:self.offset + self.length]
+	
+	def setWeights(self, weights): #void
+		#weights : float array | float memoryview
+		self.private, self.offset, self.length = weights, None, 0
+	
+	weights = property(getWeights, setWeights)
+	
+	#Copy-on-write: call before writing to self.weights in place
+	def own(self): #void
+		if self.shared or (self.offset == None and type(self.private) != array):
+			if self.buffer != None: self.buffer.append(self, self.weights)
+			else: self.weights = array(self.private.typecode if type(self.private) == array else "d", self.private)
+			self.shared = False
 	
 	#Activate based on inputs
-	def feed(self, stimuli): #float on [0.0, 1.0]
+	def feed(self, stimuli, activation = sigmoid): #float on [0.0, 1.0]
 		#stimuli : float list
-		if type(stimuli) != type(list()):
-			raise TypeError("Stimuli of type other than list")
-		elif len(stimuli) + 1 != len(self.weights):
-			raise ValueError("Count of stimuli not equal to count of weights")
-		
-		stimSum = self.weights[0]
-		for stimulus, weight in zip(stimuli, self.weights[1:]):
-			if type(stimulus) != type(float()):
-				raise TypeError("Stimulus of type other than float")
-			elif stimulus > 1.0 or stimulus < 0.0:
-				raise ValueError("Stimulus outside range")
-			stimSum += stimulus * weight
-		return sigmoid(stimSum)
+		#activation : (float -> float on [0.0, 1.0])
+		if debug:
+			checkStimuli(stimuli)
+			if len(stimuli) + 1 != len(self.weights):
+				raise ValueError("Count of stimuli not equal to count of weights")
+		#trusted: summed in the same order as a loop would, starting from the constant term
+		#   (straight from the buffer, where the weights are there, rather than through a view of them, cf getWeights(), supra)
+		offset = self.offset
+		if offset == None:
+			weights = self.private
+			return activation(sum(map(mul, stimuli, weights[1:]), weights[0]))
+		data = self.buffer.data
+		return activation(sum(map(mul, stimuli, data[offset + 1:offset + self.length]), data[offset]))
+	
+	#Same as feed(), supra, for stimuli mostly 0.0, given only the nonzero ones (cf Cortex.sparse())
+	#The terms left out are all 0.0, so the sum comes out the same
+	def feedSparse(self, values, gather, activation = sigmoid): #float on [0.0, 1.0]
+		#values : float list --- the nonzero stimuli
+		#gather : float array -> float tuple --- picks their weights out of all the weights
+		#activation : (float -> float on [0.0, 1.0])
+		weights = self.weights
+		return activation(sum(map(mul, values, gather(weights)), weights[0]))
 	
 	#Cache the updates...
 	#Since we're reusing neurons in multiple locations,
@@ -96,43 +584,73 @@ class Neuron:
 	def back(self, inputs, delta): #void
 		#inputs : float list
 		#delta : float
-		assert type(delta) == type(float())
-		assert type(inputs) == type(list())
-		assert len(inputs) + 1 == len(self.weights)
+		if debug:
+			assert type(delta) == type(float())
+			assert type(inputs) == type(list())
+			assert len(inputs) + 1 == len(self.weights)
 		
-		backs = [delta * 1.0] #start with the zero-index constant term
-		backs.extend([delta * input for input in inputs])
-		self.backs.append(backs)
+		#a running sum, so memory stays fixed however many examples we back
+		self.backsCount += 1
+		if self.backs is None:
+			self.backs = array("d", [delta * 1.0]) #start with the zero-index constant term
+			self.backs.extend([delta * input for input in inputs])
+			return
+		backs = self.backs
+		backs[0] += delta
+		i = 1
+		for input in inputs:
+			backs[i] += delta * input
+			i += 1
+	
+	#Same as back(), supra, given only the nonzero inputs (cf feedSparse(), supra)
+	def backSparse(self, positions, values, delta): #void
+		#positions : int list --- of the nonzero inputs among the weights (i.e. their indices plus 1, past the constant)
+		#values : float list --- those inputs
+		#delta : float
+		self.backsCount += 1
+		if self.backs is None: self.backs = array("d", bytes(8 * len(self.weights)))
+		backs = self.backs
+		backs[0] += delta
+		for position, value in zip(positions, values): backs[position] += delta * value
 	
 	#Commit what we've backed
-	def update(self, rate): #void
+	def update(self, rate, optimizer = defaultOptimizer): #void
 		#rate : float
-		def sums(list1, list2):
-			assert type(list1) == type(list())
-			assert type(list2) == type(list())
-			assert len(list(list1)) == len(list(list2))
-			return [l1 + l2 for l1, l2 in zip(list1, list2)]
+		#optimizer : (SGD)
+		if self.backs is None: return
 		
 		#Take the mean of all the requested updates...
 		#Nota bene: combining backed vectors might lead to nonconvergence
 		#           we should be able to learn repeatedly from a single decision
 		#           and then we'll have to check for convergence
-		updates = reduce(lambda acc, inc: [sum/float(len(self.backs)) for sum in sums(acc, inc)], \
-		self.backs, [0.0 for weight in self.weights])
+		count = float(self.backsCount)
+		updates = [sum / count for sum in self.backs]
 		
 		assert len(self.weights) == len(updates)
 		
-		self.backs = []
-		self.weights = [weight + (rate * update) for weight, update in zip(self.weights, updates)]
+		self.backs = None
+		self.backsCount = 0
+		#in place, once we own the weights
+		self.own()
+		optimizer.step(self, updates, rate)
 	
 	def __str__(self): return "|".join([str(weight) for weight in self.weights])
 
 class Cortex:
-	def __init__(self, inputSignatures, dendrons, axons, outputSignature):
+	vectorizedWeightsMinimum = 96
+	#scalar cortices skip the 0.0 inputs whenever at most this share of the inputs are nonzero (cf sparse(), infra)
+	#   and there are enough inputs for finding the zeros to pay
+	sparseShare = 0.5
+	sparseInputsMinimum = 8
+	
+	def __init__(self, inputSignatures, dendrons, axons, outputSignature, vectorized = False, activation = None):
 		#inputSignatures : Signature list
 		#dendrons : Neuron list
 		#axons : Neuron list
 		#outputSignature : Signature
+		#vectorized : (Boolean) --- ignored unless numpy is available
+		#activation : (Sigmoid)
+		self.activation = defaultActivation if activation == None else activation
 		self.inputSignatures = inputSignatures
 		self.inputDimensions = sum(signature.dimensions for signature in inputSignatures)
 		
@@ -146,170 +664,866 @@ class Cortex:
 		
 		assert len(axons) == outputSignature.dimensions
 		self.outputSignature = outputSignature
+		#as the neurons are named (cf Brain.cortexForInputsOutput()), e.g. for a Profile (infra)
+		self.summary = " * ".join([str(signature) for signature in inputSignatures]) + " -> " + str(outputSignature)
+		
+		#vectorized mode holds each layer's weights as one 2-D array (cf getMatrices(), infra)
+		#numpy's per-call overhead outweighs its arithmetic on small cortices, so they stay scalar
+		self.weightsCount = len(dendrons) * (self.inputDimensions + 1) + len(axons) * (len(dendrons) + 1)
+		self.vectorizable = vectorized and numpy != None
+		self.vectorized = self.vectorizable and not self.weightsCount < self.vectorizedWeightsMinimum
+		self.matrices = None
+	
+	#Stacks the weights of each layer into one matrix, one row per neuron (constant term in column 0)
+	#Neurons are shared among cortices, so the Brain must call invalidate() whenever weights change
+	def getMatrices(self): #(numpy array, numpy array)
+		assert self.vectorizable
+		if self.matrices == None:
+			#reshape() keeps empty layers (e.g. for the empty stimulus) two-dimensional
+			self.matrices = ( \
+			self.span(self.dendrons, self.inputDimensions + 1), \
+			self.span(self.axons, len(self.dendrons) + 1) \
+			)
+		return self.matrices
+	
+	#A layer's matrix, straight from the Brain's WeightBuffer when its neurons lie end to end there
+	#   (as those of a cortex grown at once do), else stacked
+	def span(self, neurons, width): #numpy array
+		#neurons : Neuron list
+		#width : int --- the count of weights of each
+		if len(neurons) > 0 and neurons[0].offset != None:
+			buffer, start = neurons[0].buffer, neurons[0].offset
+			n = 0
+			for neuron in neurons:
+				if neuron.buffer is not buffer or neuron.offset != start + n * width: break
+				n += 1
+			else:
+				rows = numpy.frombuffer(buffer.data, buffer.data.typecode, len(neurons) * width, start * buffer.data.itemsize)
+				return rows.reshape(len(neurons), width).astype(float, copy = False)
+		return self.stack(neurons).reshape(len(neurons), width)
+	
+	#One row of (float) weights per neuron
+	def stack(self, neurons): #numpy array
+		#neurons : Neuron list
+		return numpy.array([neuron.weights for neuron in neurons], dtype = float)
+	
+	def invalidate(self): #void
+		self.matrices = None
+	
+	#The positions among the weights and the values of the nonzero inputs, plus what gathers their weights
+	#   (cf Neuron.feedSparse(), backSparse()), or None if too many inputs are nonzero for skipping the others to pay
+	def sparse(self, inputs): #(int list, float list, float array -> float tuple) | None
+		#inputs : float list
+		if len(inputs) < self.sparseInputsMinimum: return None
+		positions = [i for i, input in enumerate(inputs, 1) if input != 0.0]
+		if len(positions) > self.sparseShare * len(inputs): return None
+		#itemgetter() gathers in C, but returns a lone item bare
+		gather = itemgetter(*positions) if len(positions) > 1 else lambda weights: tuple([weights[p] for p in positions])
+		return positions, [inputs[p - 1] for p in positions], gather
 	
 	#Classification
-	def feed(self, stimuli): #float list
+	def feed(self, stimuli, tape = False): #float list | (float list, float list)
 		#stimuli : float list
-		assert type(stimuli) == type(list())
-		assert self.inputDimensions == len(stimuli)
-		throughputs = [dendron.feed(stimuli) for dendron in self.dendrons]
-		return [axon.feed(throughputs) for axon in self.axons]
+		#tape : (Boolean) --- returns the hidden activations too, as (throughputs, outputs) for back(), infra
+		if debug:
+			checkStimuli(stimuli)
+			assert self.inputDimensions == len(stimuli)
+		if self.vectorized:
+			throughputs, outputs = self.feedMatrices(numpy.array(stimuli, dtype = float))
+			return (throughputs.tolist(), outputs.tolist()) if tape else outputs.tolist()
+		sparse = self.sparse(stimuli)
+		if sparse == None: throughputs = [dendron.feed(stimuli, self.activation.scalar) for dendron in self.dendrons]
+		else: throughputs = [dendron.feedSparse(sparse[1], sparse[2], self.activation.scalar) for dendron in self.dendrons]
+		#(the hidden activations are never 0.0, so the output layer stays dense)
+		outputs = [axon.feed(throughputs, self.activation.scalar) for axon in self.axons]
+		return (throughputs, outputs) if tape else outputs
+	
+	#Classification of many stimuli at once, in order
+	def feedBatch(self, batch, tape = False): #(float list | (float list, float list)) list
+		#batch : (float list) list
+		#tape : (Boolean) --- cf feed(), supra
+		if debug:
+			for stimuli in batch: assert self.inputDimensions == len(stimuli)
+		#batching amortizes numpy's overhead, so even small cortices can profit
+		if not self.vectorizable or len(batch) * self.weightsCount < self.vectorizedWeightsMinimum:
+			return [self.feed(stimuli, tape) for stimuli in batch]
+		hidden, output = self.getMatrices()
+		inputs = numpy.array(batch, dtype = float).reshape(len(batch), self.inputDimensions)
+		throughputs = self.activation.vector(hidden[:, 0] + inputs.dot(hidden[:, 1:].T))
+		outputs = self.activation.vector(output[:, 0] + throughputs.dot(output[:, 1:].T)).tolist()
+		return list(zip(throughputs.tolist(), outputs)) if tape else outputs
+	
+	#Vectorized classification: returns the hidden and the output activations
+	def feedMatrices(self, inputs): #(numpy array, numpy array)
+		#inputs : numpy array
+		hidden, output = self.getMatrices()
+		throughputs = self.activation.vector(hidden[:, 0] + hidden[:, 1:].dot(inputs))
+		return throughputs, self.activation.vector(output[:, 0] + output[:, 1:].dot(throughputs))
 	
 	#Backpropagation
-	def back(self, inputs, faults): #float list (faults for next level upstream)
+	def back(self, inputs, faults, taped = None): #float list (faults for next level upstream)
 		#inputs : float list
-		#outputs : float list
 		#faults : float list
+		#taped : ((float list, float list)) --- the (throughputs, outputs) that feed(inputs, True) recorded,
+		#        sparing us from feeding the inputs forward again
 		
 		#inputs is the activations getting fed into all the dendrons
 		#outputs is what we 
 		#faults is | topmost outputs: (label - activation)
 		#          | internal layers: (how much error it contributes to next higher layer = delta_higher * weight_of_my_outputs_in_higher)
-		assert type(inputs) == type(list())
-		assert type(faults) == type(list())
-		assert len(inputs) == self.inputDimensions
-		assert len(faults) == len(self.axons)
-		
-		def propagate(inputs, neurons, outputs, faults):
+		if debug:
 			assert type(inputs) == type(list())
-			assert type(neurons) == type(list())
-			assert type(outputs) == type(list())
 			assert type(faults) == type(list())
-			assert len(neurons) == len(outputs) and len(outputs) == len(faults)
+			assert len(inputs) == self.inputDimensions
+			assert len(faults) == len(self.axons)
+		
+		def propagate(inputs, neurons, outputs, faults, sparse = None):
+			if debug:
+				assert type(inputs) == type(list())
+				assert type(neurons) == type(list())
+				assert type(outputs) == type(list())
+				assert type(faults) == type(list())
+				assert len(neurons) == len(outputs) and len(outputs) == len(faults)
 			
 			delta = lambda activation, fault: activation * (1.0 - activation) * fault
 			faultsUpstream = [0.0 for input in inputs]
 			for neuron, output, fault in zip(neurons, outputs, faults):
 				neuronDelta = delta(output, fault)
-				neuron.back(inputs, neuronDelta)
+				if sparse == None: neuron.back(inputs, neuronDelta)
+				else: neuron.backSparse(sparse[0], sparse[1], neuronDelta)
 				
+				#(straight from the buffer, like Neuron.feed())
+				offset = neuron.offset
+				nextWeights = neuron.private[1:] if offset == None else neuron.buffer.data[offset + 1:offset + neuron.length]
 				faultsUpstream = \
 				[accumulation + (nextWeight * neuronDelta) \
 				for accumulation, nextWeight \
-				in zip(faultsUpstream, neuron.weights[1:])]
+				in zip(faultsUpstream, nextWeights)]
 			
 			return faultsUpstream
 		
-		throughputs = [dendron.feed(inputs) for dendron in self.dendrons]
-		outputs = [axon.feed(throughputs) for axon in self.axons]
+		if self.vectorized: return self.backMatrices(inputs, faults, taped)
+		
+		if taped != None: throughputs, outputs = taped
+		else: throughputs, outputs = self.feed(inputs, True)
 		
 		return propagate( \
 		inputs, \
 		self.dendrons, \
 		throughputs, \
-		propagate(throughputs, self.axons, outputs, faults) \
+		propagate(throughputs, self.axons, outputs, faults), \
+		self.sparse(inputs) \
 		)
-			
+	
+	#Vectorized backpropagation: same as back(), supra, with each layer's deltas as matrix operations
+	def backMatrices(self, inputs, faults, taped = None): #float list (faults for next level upstream)
+		#inputs : float list
+		#faults : float list
+		#taped : ((float list, float list))
+		hidden, output = self.getMatrices()
+		activations = numpy.array(inputs, dtype = float)
+		if taped == None: throughputs, outputs = self.feedMatrices(activations)
+		else: throughputs, outputs = numpy.array(taped[0], dtype = float), numpy.array(taped[1], dtype = float)
+		
+		outputDeltas = outputs * (1.0 - outputs) * numpy.array(faults, dtype = float)
+		hiddenDeltas = throughputs * (1.0 - throughputs) * output[:, 1:].T.dot(outputDeltas)
+		
+		#cache the same backed vectors as Neuron.back() would, one row per neuron
+		for neurons, deltas, layerInputs in \
+		((self.axons, outputDeltas, throughputs), (self.dendrons, hiddenDeltas, activations)):
+			backs = numpy.outer(deltas, numpy.concatenate(([1.0], layerInputs)))
+			for neuron, neuronBacks in zip(neurons, backs):
+				neuron.backsCount += 1
+				#numpy adds into a numpy running sum (in place) far faster than into an array
+				if neuron.backs is None: neuron.backs = neuronBacks.copy()
+				else: neuron.backs += neuronBacks
+		
+		return hidden[:, 1:].T.dot(hiddenDeltas).tolist()
+
+
+#Per-cortex counts and timings of the passes through brains: which cortices are hot, and how big they are
+#Brains record into their profile, if any (cf Brain.setProfile()); brains made while defaultProfile (infra) is set
+#   record into it, so that one Profile can gather a whole run (cf GeNNSinG -i)
+#Records are keyed by the cortex's summary, so that the same cortex in different brains adds up
+class Profile:
+	def __init__(self):
+		self.records = {} #:(string : int | float) dictionary dictionary, keyed by cortex summary
+	
+	def record(self, cortex, direction, seconds, count = 1): #void
+		#cortex : Cortex
+		#direction : string --- "forward" or "backward"
+		#seconds : float
+		#count : (int) --- of the stimuli passed, e.g. in a batch
+		if cortex.summary not in self.records:
+			self.records[cortex.summary] = { \
+			"forward":0, "forwardSeconds":0.0, "backward":0, "backwardSeconds":0.0, \
+			"inputs":cortex.inputDimensions, "neurons":len(cortex.dendrons) + len(cortex.axons), \
+			"weights":cortex.weightsCount, "vectorized":cortex.vectorized \
+			}
+		record = self.records[cortex.summary]
+		record[direction] += count
+		record[direction + "Seconds"] += seconds
+	
+	def reset(self): #void
+		self.records = {}
+	
+	#The summaries of the cortices, the most time first
+	def order(self): #string list
+		return sorted(self.records, key = lambda summary: \
+		-(self.records[summary]["forwardSeconds"] + self.records[summary]["backwardSeconds"]))
+	
+	def table(self, limit = None): #string
+		#limit : (int) --- how many of the hottest cortices to list; all if None
+		lines = ["%10s %10s %10s %10s %6s %7s %8s  %s" % \
+		("forward", "fwd ms", "backward", "bwd ms", "inputs", "neurons", "weights", "cortex")]
+		for summary in self.order()[:limit]:
+			record = self.records[summary]
+			lines.append("%10i %10.1f %10i %10.1f %6i %7i %8i  %s" % \
+			(record["forward"], 1e3 * record["forwardSeconds"], record["backward"], 1e3 * record["backwardSeconds"], \
+			record["inputs"], record["neurons"], record["weights"], summary))
+		return "\n".join(lines)
+	
+	def toJSON(self): #string
+		return json.dumps(self.records, indent = 1, sort_keys = True)
+	
+	def save(self, path): #void
+		#path : string
+		with open(path, 'w') as store: store.write(self.toJSON())
+
+#Set to a Profile (e.g. for a whole run) to have every Brain made thereafter record into it
+defaultProfile = None
+
+#Which of count trials succeed, each independently with the given chance (sorted positions)
+#Draws in bulk rather than once per trial: numpy draws how many succeed, then which;
+#   otherwise, geometric skips jump straight from one success to the next
+def bernoulliPositions(count, chance, rng = None): #int list
+	#count : int
+	#chance : float
+	#rng : (random.Random) --- defaults to the random module
+	if rng == None: rng = random
+	if not chance > 0.0 or count == 0: return []
+	if not chance < 1.0: return list(range(count))
+	if numpy != None:
+		generator = numpy.random.default_rng(rng.getrandbits(64))
+		return numpy.sort(generator.choice(count, generator.binomial(count, chance), replace = False)).tolist()
+	positions = []
+	logFailure = math.log(1.0 - chance)
+	position = -1
+	while True:
+		position += 1 + int(math.log(1.0 - rng.random()) / logFailure)
+		if not position < count: return positions
+		positions.append(position)
 
 class Brain:
+	#The child shares its parent's weights, copying a neuron's only once it writes to them
 	@classmethod
-	def clone(self, parent, perturb = 0.1, mutate = 0.05):
-		#brains : Brain list
+	def clone(self, parent, perturb = 0.1, mutate = 0.05, perturbed = 1.0, rng = None):
+		#parent : Brain
 		#perturb : float
 		#mutate : float
+		#perturbed : (float) --- the share of neurons to perturb, sampled at random (1.0 perturbs every neuron)
+		#rng : (random.Random) --- e.g. random.Random(seed), for a reproducible child; defaults to the random module
 		assert parent.__class__ == self
 		assert type(perturb) == type(float())
 		assert type(mutate) == type(float())
+		assert not perturbed < 0.0 and not perturbed > 1.0
 		
-		child = self()
+		child = self(vectorized = parent.vectorized, binary = parent.binary, activation = parent.activation, \
+		typecode = parent.typecode, optimizer = parent.optimizer, cacheSize = parent.cacheSize)
 		
+		#mapped files may be overwritten while the child still needs them
+		parent.unmap()
+		#unloaded neurons never change in place, so the child can share them as is
+		child.unloaded = dict(parent.unloaded)
 		for summary in parent.neurons:
-			child.neurons[summary] = \
-			Neuron([w * random.uniform(1.0 - perturb, 1.0 + perturb) \
-			for w in parent.neurons[summary].weights])
+			parent.neurons[summary].shared = True
+			child.neurons[summary] = Neuron(parent.neurons[summary].weights, True, child.typecode, child.buffer)
+			child.neurons[summary].shared = True
 		
-		child.mutate(mutate)
+		if rng == None: rng = random
+		summaries = list(child.neurons.keys()) + list(child.unloaded.keys())
+		if perturbed < 1.0: summaries = rng.sample(summaries, int(round(perturbed * len(summaries))))
+		child.materialize([summary for summary in summaries if summary in child.unloaded])
+		#scales every weight by a factor uniform on [1 - perturb, 1 + perturb]
+		neurons = [child.neurons[summary] for summary in summaries]
+		if numpy != None and len(neurons) > 0:
+			#all at once, into one stretch of the child's buffer
+			counts = [len(neuron.weights) for neuron in neurons]
+			weights = numpy.concatenate([numpy.asarray(neuron.weights, dtype = float) for neuron in neurons])
+			weights *= numpy.random.default_rng(rng.getrandbits(64)).uniform(1.0 - perturb, 1.0 + perturb, len(weights))
+			child.buffer.extend(neurons, counts, weights.astype("float32" if child.typecode == "f" else float))
+		else:
+			for neuron in neurons:
+				child.buffer.append(neuron, [w * rng.uniform(1.0 - perturb, 1.0 + perturb) for w in neuron.weights])
+		for neuron in neurons: neuron.shared = False
+		
+		child.mutate(mutate, rng)
 		return child
 				
-	def __init__(self, path = None):
-		#path : string
+	def __init__(self, path = None, vectorized = None, binary = False, mapped = False, lazy = False, activation = None, \
+	typecode = "d", optimizer = None, cacheSize = None, profile = None, store = None):
+		#path : string --- or, with a store, the name of the brain in it
+		#vectorized : (Boolean) --- defaults to True whenever numpy is available
+		#binary : (Boolean) --- the format for saving; loading detects the format of the file
+		#mapped : (Boolean) --- cf loadFromPath(), infra
+		#lazy : (Boolean) --- cf loadFromPath(), infra
+		#activation : (Sigmoid) --- cf setActivation(), infra
+		#typecode : (string) --- "d" holds weights as float64, "f" as float32 (halving memory); files always hold float64
+		#optimizer : (SGD) --- cf setOptimizer(), infra
+		#cacheSize : (int) --- cf setCache(), infra
+		#profile : (Profile) --- cf setProfile(), infra; defaults to defaultProfile
+		#store : (BrainStore) --- cf loadFromStore(), infra
+		assert typecode in ("d", "f")
+		self.typecode = typecode
+		self.optimizer = defaultOptimizer if optimizer == None else optimizer
+		self.activation = defaultActivation if activation == None else activation
 		self.cortices = {}
 		self.neurons = {} #:(Neuron list) dictionary, keyed by signature
+		#the weights of the neurons, end to end (cf WeightBuffer, supra)
+		self.buffer = WeightBuffer(typecode)
+		#neurons indexed in the file but not yet parsed (cf materialize(), infra), keyed likewise
+		self.unloaded = {} #:(string | (float array, int, int)) dictionary
 		self.typeDimensions = {} #:int dictionary, keyed by keys that will appear in stimuli
 		self.randomWeightsRange = 0.1
-		if path != None: self.loadFromPath(path)
+		self.vectorized = (numpy != None) if vectorized == None else (vectorized and numpy != None)
+		self.binary = binary
+		self.mapping = None
+		#the neurons that have backed gradients since the last update() (cf feedBackward(), infra)
+		self.dirty = set() #:Neuron set
+		#the neurons whose weights differ from the file's (cf checkpoint(), infra)
+		self.changed = set() #:Neuron set
+		self.cacheHits, self.cacheMisses = 0, 0
+		self.setCache(cacheSize)
+		self.profile = defaultProfile if profile == None else profile
+		#where save() goes: the file at self.path, or else the record of that name in the store
+		self.store = None
+		if path != None and store != None: self.loadFromStore(store, path, lazy)
+		elif path != None: self.loadFromPath(path, mapped, lazy)
 	
 	def load(self):
 		assert self.path != None
+		if self.store != None: return self.loadFromStore(self.store, self.path)
 		return self.loadFromPath(self.path)
 	
-	def loadFromPath(self, path):
+	def loadFromPath(self, path, mapped = False, lazy = False):
 		#path : string
+		#mapped : (Boolean) --- for binary files, maps the weights read-only rather than reading them
+		#         (writing to the weights of a mapped Brain first copies them)
+		#lazy : (Boolean) --- only indexes the signatures; neuronsForSignatures() parses weights on demand
 		assert type(path) == type(str())
-		self.path = path
+		self.path, self.store = path, None
+		self.forget()
 		if not os.path.isfile(path): self.save()
-		with open(path, 'r') as store:
-			for line in store:
-				pieces = line.strip().split("\t")
-				assert len(pieces) == 2
-				self.neurons[pieces[0]] = \
-				Neuron([float(w) for w in pieces[1].split("|")]) #cf Neuron.__str__()
+		with open(path, 'rb') as store:
+			binary = store.read(len(binaryMagic)) == binaryMagic
+			store.seek(0)
+			#maps of empty files aren't possible, but every binary file has a header
+			data = mmap.mmap(store.fileno(), 0, access = mmap.ACCESS_READ) if mapped and binary else store.read()
+		self.decode(data, mapped, lazy)
+		self.replay(lazy)
+		if self.buffer.garbage > 0: self.compact()
+		else: self.buffer.trim()
 		return self
 	
+	#Like loadFromPath(), from the record of that name in a BrainStore (infra); save() then goes back to it
+	def loadFromStore(self, store, name, lazy = False, payload = None):
+		#store : BrainStore
+		#name : string
+		#lazy : (Boolean)
+		#payload : (bytes) --- the record, if already read (cf BrainStore.brains())
+		assert type(name) == type(str())
+		self.path, self.store = name, store
+		self.forget()
+		if payload == None and name not in store: self.save()
+		self.decode(store.read(name) if payload == None else payload, False, lazy)
+		self.amend(store.journaled(name), lazy)
+		if self.buffer.garbage > 0: self.compact()
+		else: self.buffer.trim()
+		return self
+	
+	#Drops every neuron and every trace of them, ahead of loading others
+	def forget(self): #void
+		#the neurons we're about to replace would leave their weights behind (cf compact(), infra)
+		self.buffer.garbage += self.buffer.size
+		#the cortices would otherwise keep the neurons we're about to replace
+		self.cortices = {}
+		if self.cache != None: self.cache.clear()
+		self.dirty = set()
+		self.changed = set()
+		self.unloaded = {}
+	
+	#Reads the content of a brain file, in either format
+	def decode(self, data, mapped = False, lazy = False): #void
+		#data : bytes | mmap.mmap
+		#mapped : (Boolean) --- cf loadFromPath(), supra
+		#lazy : (Boolean)
+		self.binary = data[:len(binaryMagic)] == binaryMagic
+		if self.binary: return self.decodeBinary(data, mapped, lazy)
+		#parsed end to end, to go into the buffer in one go
+		neurons, counts, weights = [], [], array(self.typecode)
+		for signature, text in parseLines(bytes(data).decode("utf-8")):
+			if lazy:
+				self.neurons.pop(signature, None)
+				self.unloaded[signature] = text
+			else:
+				values = parseWeights(text)
+				weights.extend(values)
+				counts.append(len(values))
+				neurons.append(Neuron(None, True, self.typecode, self.buffer))
+				self.neurons[signature] = neurons[-1]
+		self.buffer.extend(neurons, counts, weights)
+	
+	def decodeBinary(self, data, mapped = False, lazy = False): #void
+		#data : bytes | mmap.mmap
+		#mapped : (Boolean)
+		#lazy : (Boolean)
+		#cf binaryMagic, supra
+		magic, version, neuronsCount, weightsCount = struct.unpack_from("<4sIIQ", data, 0)
+		assert magic == binaryMagic
+		if version != binaryVersion: raise ValueError("Brain file version %i unhandled" % version)
+		
+		position = struct.calcsize("<4sIIQ")
+		index = []
+		for n in range(neuronsCount):
+			length, = struct.unpack_from("<I", data, position)
+			position += 4
+			signature = bytes(data[position:position + length]).decode("utf-8")
+			position += length
+			count, = struct.unpack_from("<I", data, position)
+			position += 4
+			index.append((signature, count))
+		position += -position % 8
+		assert len(data) == position + 8 * weightsCount
+		
+		if mapped and sys.byteorder == "little":
+			self.mapping = data
+			weights = memoryview(data)[position:].cast("d")
+		else:
+			weights = array("d")
+			weights.frombytes(bytes(data[position:]))
+			if sys.byteorder != "little": weights.byteswap()
+			if mapped: data.close()
+		
+		if not lazy and self.mapping == None:
+			#in one go, straight into the buffer
+			neurons = [Neuron(None, True, self.typecode, self.buffer) for signature, count in index]
+			self.buffer.extend(neurons, [count for signature, count in index], weights)
+			for (signature, count), neuron in zip(index, neurons): self.neurons[signature] = neuron
+		else:
+			offset = 0
+			for signature, count in index:
+				self.neurons.pop(signature, None)
+				self.unloaded[signature] = (weights, offset, count)
+				offset += count
+			assert offset == weightsCount
+			if not lazy: self.materialize()
+	
+	#Applies the journal of the file, if any (cf journalMagic, supra), then drops whatever follows its last complete block
+	def replay(self, lazy = False): #void
+		#lazy : (Boolean)
+		journalPath = self.path + journalSuffix
+		if not os.path.isfile(journalPath): return
+		with open(journalPath, 'rb') as store: data = store.read()
+		header = (journalMagic + "\t" + fileStamp(self.path) + "\n").encode("utf-8")
+		#e.g. left over by a crash between replacing the file and removing its journal
+		if not data.startswith(header): return
+		latest = {} #:string dictionary, keyed by signature
+		records = []
+		start = position = len(header)
+		while True:
+			end = data.find(b"\n", position)
+			if end < 0: break
+			line = data[position:end]
+			if line.startswith(b"=\t"):
+				pieces = line.split(b"\t")
+				if len(pieces) != 3 or pieces[1] != str(len(records)).encode("utf-8") or \
+				pieces[2] != str(zlib.crc32(data[start:position])).encode("utf-8"): break
+				latest.update(parseLines(b"\n".join(records).decode("utf-8")))
+				records = []
+				start = end + 1
+			else: records.append(line)
+			position = end + 1
+		#later blocks would otherwise append to what we can't read
+		if start < len(data):
+			with open(journalPath, 'r+b') as store: store.truncate(start)
+		self.amend(latest, lazy)
+	
+	#Replaces the neurons of the records (cf parseLines(), supra) with theirs, e.g. from a journal
+	def amend(self, latest, lazy = False): #void
+		#latest : string dictionary --- the text of the weights, keyed by signature
+		#lazy : (Boolean)
+		neurons, counts, weights = [], [], array(self.typecode)
+		for signature, text in latest.items():
+			#(replaced where they are, so that the brain encodes in the order it loaded)
+			old = self.neurons.get(signature)
+			if old != None and old.buffer is self.buffer and old.offset != None: self.buffer.garbage += old.length
+			if lazy:
+				self.neurons.pop(signature, None)
+				self.unloaded[signature] = text
+				continue
+			self.unloaded.pop(signature, None)
+			values = parseWeights(text)
+			weights.extend(values)
+			counts.append(len(values))
+			neurons.append(Neuron(None, True, self.typecode, self.buffer))
+			self.neurons[signature] = neurons[-1]
+		self.buffer.extend(neurons, counts, weights)
+	
+	#Parses the weights of unloaded neurons: those given, or else all of them
+	def materialize(self, signatures = None): #void
+		#signatures : (string list)
+		generation = self.buffer.generation
+		for signature in (list(self.unloaded.keys()) if signatures == None else signatures):
+			source = self.unloaded.pop(signature)
+			if type(source) == type(str()):
+				self.neurons[signature] = \
+				Neuron(parseWeights(source), False, self.typecode, self.buffer)
+			else:
+				weights, offset, count = source
+				if self.mapping != None and type(weights) == type(memoryview(b"")):
+					self.neurons[signature] = Neuron(weights[offset:offset + count], True, self.typecode, self.buffer)
+				else:
+					#through a memoryview, so as to copy the weights only once, into the buffer
+					self.neurons[signature] = Neuron(memoryview(weights)[offset:offset + count], False, self.typecode, self.buffer)
+		#views of the old array would go stale
+		if self.buffer.generation != generation: self.invalidate(True)
+	
+	#Copies the weights out of the mapped file (e.g. before overwriting it)
+	def unmap(self): #void
+		if self.mapping == None: return
+		for neuron in self.neurons.values():
+			if neuron.offset == None and type(neuron.private) == type(memoryview(b"")) and neuron.private.readonly:
+				self.buffer.append(neuron, neuron.private)
+		copies = {}
+		for signature, source in self.unloaded.items():
+			if type(source) != type(str()) and type(source[0]) == type(memoryview(b"")):
+				if id(source[0]) not in copies: copies[id(source[0])] = array("d", source[0])
+				self.unloaded[signature] = (copies[id(source[0])], source[1], source[2])
+		self.invalidate()
+		self.mapping = None
+	
 	def save(self):
 		assert self.path != None
+		if self.store != None: return self.saveToStore(self.store, self.path)
 		return self.saveToPath(self.path)
 	
+	#Writes the whole Brain to a temporary file, then replaces the file with it (and drops the journal, cf checkpoint(), infra),
+	#   so that a crash at any point leaves either version whole
 	def saveToPath(self, path):
 		#path : string
 		assert type(path) == type(str())
-		self.path = path
-		with open(path, 'w') as store:
-			store.write("\n".join([summary + "\t" + str(neuron) \
-		for summary, neuron in zip(self.neurons.keys(), self.neurons.values())]))
+		self.path, self.store = path, None
+		#the mapped file stays as it is until replaced, but views of it would outlive the replacement
+		self.unmap()
+		temporaryPath = path + temporarySuffix
+		with open(temporaryPath, 'wb') as store:
+			store.write(self.encode())
+			store.flush()
+			os.fsync(store.fileno())
+		os.replace(temporaryPath, path)
+		#a crash before this leaves a journal stamped for the file replaced (cf replay(), supra)
+		if os.path.isfile(path + journalSuffix): os.remove(path + journalSuffix)
+		self.changed = set()
+		return self
+	
+	#Puts the whole Brain into a BrainStore (infra), under the name, in a transaction of its own unless one is open
+	def saveToStore(self, store, name):
+		#store : BrainStore
+		#name : string
+		assert type(name) == type(str())
+		self.path, self.store = name, store
+		store.put(name, self.encode())
+		self.changed = set()
 		return self
 	
-	def update(self, rate): #void --- updates weights in all neurons
+	#Appends the neurons that changed since the last save, load or checkpoint to the journal of the file
+	#   (cf journalMagic, supra), in one block; far cheaper than save() when training touches few neurons
+	#   In a BrainStore (infra), they go in a "J" record of their own instead (cf poolMagic, supra)
+	#Once the journal outgrows compaction times the file, saves the whole Brain instead (which drops the journal)
+	def checkpoint(self, compaction = 1.0):
+		#compaction : (float)
+		assert self.path != None
+		if (self.store == None and not os.path.isfile(self.path)) or (self.store != None and self.path not in self.store):
+			return self.save()
+		changed = [(summary, neuron) for summary, neuron in self.neurons.items() if neuron in self.changed]
+		if len(changed) == 0: return self
+		records = "".join([summary + "\t" + str(neuron) + "\n" for summary, neuron in changed]).encode("utf-8")
+		if self.store != None:
+			if self.store.journalSize(self.path) + len(records) > compaction * self.store.index[self.path][1]: return self.save()
+			self.store.journal(self.path, records)
+			self.changed = set()
+			return self
+		block = records + ("=\t%i\t%i\n" % (len(changed), zlib.crc32(records))).encode("utf-8")
+		journalPath = self.path + journalSuffix
+		header = (journalMagic + "\t" + fileStamp(self.path) + "\n").encode("utf-8")
+		#a journal for another version of the file is of no use to anyone
+		fresh = True
+		if os.path.isfile(journalPath):
+			with open(journalPath, 'rb') as store: fresh = store.read(len(header)) != header
+		with open(journalPath, 'wb' if fresh else 'ab') as store:
+			store.write(header + block if fresh else block)
+			store.flush()
+			os.fsync(store.fileno())
+		self.changed = set()
+		if os.path.getsize(journalPath) > compaction * os.path.getsize(self.path): return self.save()
+		return self
+	
+	#The content of a brain file, in the format of self.binary
+	def encode(self): #bytes
+		if self.binary: return self.encodeBinary()
+		#unloaded neurons from text files keep their text as is
+		lines = [summary + "\t" + str(neuron) \
+		for summary, neuron in zip(self.neurons.keys(), self.neurons.values())]
+		lines.extend([summary + "\t" + (source if type(source) == type(str()) else \
+		"|".join([str(weight) for weight in source[0][source[1]:source[1] + source[2]]])) \
+		for summary, source in zip(self.unloaded.keys(), self.unloaded.values())])
+		return "\n".join(lines).encode("utf-8")
+	
+	def encodeBinary(self): #bytes
+		#cf binaryMagic, supra
+		summaries = list(self.neurons.keys()) + list(self.unloaded.keys())
+		weights = array("d")
+		index = []
+		#every neuron in the buffer: write it whole, once compacted into the order of the index
+		whole = len(self.unloaded) == 0 and None not in [neuron.offset for neuron in self.neurons.values()]
+		if whole:
+			self.compact()
+			if self.typecode == "d": weights.frombytes(self.buffer.view[:self.buffer.size].cast("B"))
+			else: weights.extend(self.buffer.view[:self.buffer.size])
+		for summary in summaries:
+			if whole:
+				encoded = summary.encode("utf-8")
+				index.append(struct.pack("<I", len(encoded)) + encoded + struct.pack("<I", len(self.neurons[summary].weights)))
+				continue
+			if summary in self.neurons: neuronWeights = self.neurons[summary].weights
+			elif type(self.unloaded[summary]) == type(str()):
+				neuronWeights = parseWeights(self.unloaded[summary])
+			else:
+				source, offset, count = self.unloaded[summary]
+				neuronWeights = source[offset:offset + count]
+			#float32 weights widen back to float64
+			if type(neuronWeights) == array and neuronWeights.typecode != "d": neuronWeights = neuronWeights.tolist()
+			weights.extend(neuronWeights)
+			encoded = summary.encode("utf-8")
+			index.append(struct.pack("<I", len(encoded)) + encoded + struct.pack("<I", len(neuronWeights)))
+		if sys.byteorder != "little": weights.byteswap()
+		
+		header = struct.pack("<4sIIQ", binaryMagic, binaryVersion, len(summaries), len(weights)) + b"".join(index)
+		return header + b"\0" * (-len(header) % 8) + weights.tobytes()
+	
+	def update(self, rate): #void --- updates weights in every neuron that backed anything
 		#rate : float
 		assert type(rate) == type(float())
-		for neuron in self.neurons.values(): neuron.update(rate)
+		#only the neurons that got any gradient (cf feedBackward(), infra)
+		for neuron in self.dirty: neuron.update(rate, self.optimizer)
+		self.changed.update(self.dirty)
+		self.dirty = set()
+		self.invalidate()
+		#e.g. once the neurons shared with a clone have all been copied
+		if self.buffer.garbage > self.buffer.size // 2: self.compact()
+	
+	#Switches the optimizer (e.g. to Adam()) that update() steps the weights with
+	#The state it keeps per neuron lasts as long as this Brain does (it isn't saved)
+	def setOptimizer(self, optimizer): #void
+		#optimizer : SGD
+		self.optimizer = optimizer
+		for neuron in self.neurons.values(): neuron.moments = None
+	
+	#Switches the activation function (e.g. to a LookupSigmoid), for every cortex
+	def setActivation(self, activation): #void
+		#activation : Sigmoid
+		self.activation = activation
+		for cortex in self.cortices.values(): cortex.activation = activation
+		if self.cache != None: self.cache.clear()
+	
+	#Tells every cortex that its neurons' weights have changed (and forgets the activations they gave)
+	def invalidate(self, moved = False): #void
+		#moved : (Boolean) --- only where the weights lie has changed (cf WeightBuffer), not what they are
+		for cortex in self.cortices.values(): cortex.invalidate()
+		if self.cache != None and not moved: self.cache.clear()
+	
+	#Records the calls and time of every cortex into the profile (cf Profile, supra), or stops recording if None
+	def setProfile(self, profile): #void
+		#profile : Profile | None
+		self.profile = profile
+	
+	#Keeps the activations of the last cacheSize distinct stimuli (by content, cf Stimulus.digest()) per outputsType,
+	#   so that a stimulus seen before skips its forward pass entirely (e.g. an option that recurs across decisions)
+	#Anything that changes the weights (update(), mutate(), loading) empties the cache (cf invalidate(), supra)
+	#cacheHits and cacheMisses count lookups since the Brain was made
+	def setCache(self, cacheSize, resolution = 2 ** 20): #void
+		#cacheSize : int | None --- None (or 0) for no cache
+		#resolution : (int) --- inputs closer than 1/resolution count as equal
+		self.cacheSize = cacheSize if cacheSize else None
+		self.cacheResolution = resolution
+		self.cache = OrderedDict() if self.cacheSize != None else None #:(float list) dictionary, least recent first
+	
+	#The cached activations for the stimulus, if any (counting the hit or miss), and the key to cache them by
+	def recall(self, stimulus, outputsType): #(float list | None, hashable)
+		#stimulus : Stimulus --- validated
+		#outputsType : string
+		key = (stimulus.digest(self.cacheResolution), Signature.intern(outputsType))
+		if key not in self.cache:
+			self.cacheMisses += 1
+			return None, key
+		self.cacheHits += 1
+		self.cache.move_to_end(key)
+		return list(self.cache[key]), key
+	
+	def remember(self, key, activations): #void
+		#key : hashable --- cf recall(), supra
+		#activations : float list
+		self.cache[key] = activations
+		if len(self.cache) > self.cacheSize: self.cache.popitem(False)
+	
+	#Packs the weights of the neurons into the buffer in their order, dropping those left behind
+	#   (by neurons that moved or were replaced); neurons that view weights elsewhere (e.g. mapped) stay put
+	def compact(self): #void
+		self.buffer.compact(list(self.neurons.values()))
+		self.invalidate(True)
 	
 	#Useful to break free of local optima
-	def mutate(self, rate):
+	#Only the neurons that actually mutate get parsed or copied (cf Neuron.own(), supra)
+	#Each weight mutates independently, with chance rate; we draw only which ones do (cf bernoulliPositions(), supra)
+	def mutate(self, rate, rng = None):
 		#rate : float
-		for neuron in self.neurons.values():
-			for w in range(len(neuron.weights)):
-				if random.uniform(0.0, 1.0) < rate:
-					neuron.weights[w] = \
-					random.uniform(-self.randomWeightsRange, self.randomWeightsRange)
+		#rng : (random.Random) --- for reproducible mutations; defaults to the random module
+		if rng == None: rng = random
+		summaries = list(self.neurons.keys()) + list(self.unloaded.keys())
+		offsets = [0]
+		for summary in summaries: offsets.append(offsets[-1] + self.countWeights(summary))
+		
+		#positions come sorted, so one pass over the neurons finds them all
+		s = 0
+		for position in bernoulliPositions(offsets[-1], rate, rng):
+			while not position < offsets[s + 1]: s += 1
+			if summaries[s] in self.unloaded: self.materialize([summaries[s]])
+			neuron = self.neurons[summaries[s]]
+			neuron.own()
+			neuron.weights[position - offsets[s]] = \
+			rng.uniform(-self.randomWeightsRange, self.randomWeightsRange)
+			self.changed.add(neuron)
+		self.invalidate()
+		if self.buffer.garbage > self.buffer.size // 2: self.compact()
+	
+	def countWeights(self, summary): #int --- without parsing unloaded neurons
+		#summary : string
+		if summary in self.neurons: return len(self.neurons[summary].weights)
+		source = self.unloaded[summary]
+		return source.count("|") + 1 if type(source) == type(str()) else source[2]
 	
 	#CLASSIFICATION
-	def feedForward(self, stimulus, outputsType, outputsCount = None):
+	def feedForward(self, stimulus, outputsType, outputsCount = None, tape = False):
 		#stimulus : Stimulus
 		#outputsType : string
 		#outputsCount : (int)
+		#tape : (Boolean) --- records the hidden activations too (on stimulus.tape, recursively), for feedBackward()
 		
 		assert stimulus.__class__ == Stimulus
+		if outputsType in stimulus.activations and (not tape or (stimulus.tape != None and outputsType in stimulus.tape)):
+			return stimulus.activations[outputsType]
+		stimulus.validate()
+		#the tape needs the hidden activations, which the cache doesn't keep
+		key = None
+		if self.cache != None and not tape:
+			activations, key = self.recall(stimulus, outputsType)
+			if activations != None:
+				stimulus.activations[outputsType] = activations
+				return activations
 		
 		#First, we have to make sure (recursively)
 		#       that we have evaluated all downstream stimuli
 		#       on which our current classification depends
 		inputs = []
 		for v in range(len(stimulus.values)):
-			if stimulus.values[v] == None:
-				stimulus.values[v] = self.feedForward(stimulus.sources[v], stimulus.keys[v])
+			if stimulus.values[v] == None or (tape and type(stimulus.sources[v]) != type(list())):
+				stimulus.values[v] = self.feedForward(stimulus.sources[v], stimulus.keys[v], None, tape)
 			elif stimulus.keys[v] not in self.typeDimensions:
 				self.typeDimensions[stimulus.keys[v]] = len(stimulus.values[v])
 			assert len(stimulus.values[v]) == self.typeDimensions[stimulus.keys[v]]
 				
-			inputs.extend(stimulus.values[v])
+			if stimulus.flat == None: inputs.extend(stimulus.values[v])
+		if stimulus.flat != None: inputs = stimulus.flat
 		
 		#Now we know that inputs is a simple float list
 		
-		#Check outputsCount; if necessary, infer it from stimulus
-		if outputsType not in self.typeDimensions:
-			if outputsCount == None:
-				outputsCount = int(0.5 + float(len(inputs))/2.0)
-			self.typeDimensions[outputsType] = outputsCount
-		elif outputsCount == None:
-			outputsCount = self.typeDimensions[outputsType]
-		assert self.typeDimensions[outputsType] == outputsCount
+		#return : float list
+		cortex = self.cortexForKeys(stimulus.keyIds, len(inputs), outputsType, outputsCount)
+		if self.profile != None: start = time.perf_counter()
+		if tape:
+			if stimulus.tape == None: stimulus.tape = {}
+			stimulus.tape[outputsType], stimulus.activations[outputsType] = cortex.feed(inputs, True)
+		else: stimulus.activations[outputsType] = cortex.feed(inputs)
+		if self.profile != None: self.profile.record(cortex, "forward", time.perf_counter() - start)
+		if key != None: self.remember(key, list(stimulus.activations[outputsType]))
+		return stimulus.activations[outputsType]
+	
+	#CLASSIFICATION, BATCHED --- one pass per distinct cortex rather than one per stimulus
+	def feedForwardBatch(self, stimuli, outputsType, outputsCount = None, tape = False): #(float list) list, in order of stimuli
+		#stimuli : Stimulus list
+		#outputsType : string
+		#outputsCount : (int)
+		#tape : (Boolean) --- cf feedForward(), supra
 		
-		inputSignatures = [Signature(kind, self.typeDimensions[kind]) for kind in stimulus.keys]
-		outputSignature = Signature(outputsType, self.typeDimensions[outputsType])
+		for stimulus in stimuli:
+			assert stimulus.__class__ == Stimulus
+			stimulus.validate()
 		
-		#return : float list
-		return self.cortexForInputsOutput(inputSignatures, outputSignature).feed(inputs)
+		#Evaluate each distinct Stimulus only once, and none that we've already evaluated (and taped, if need be)
+		distinct = list(dict([(id(stimulus), stimulus) for stimulus in stimuli \
+		if outputsType not in stimulus.activations or (tape and (stimulus.tape == None or outputsType not in stimulus.tape))]).values())
+		#nor any that the cache knows (unless taping, cf feedForward(), supra)
+		keys = {} #:hashable dictionary, keyed by id(Stimulus)
+		if self.cache != None and not tape:
+			for stimulus in distinct:
+				activations, keys[id(stimulus)] = self.recall(stimulus, outputsType)
+				if activations != None: stimulus.activations[outputsType] = activations
+			distinct = [stimulus for stimulus in distinct if outputsType not in stimulus.activations]
+		
+		#First, evaluate all the downstream stimuli, batched by key
+		pending = {} #:((Stimulus, int) list) dictionary, keyed by key
+		for stimulus in distinct:
+			for v in range(len(stimulus.values)):
+				if stimulus.values[v] == None or (tape and type(stimulus.sources[v]) != type(list())):
+					if stimulus.keys[v] not in pending: pending[stimulus.keys[v]] = []
+					pending[stimulus.keys[v]].append((stimulus, v))
+				elif stimulus.keys[v] not in self.typeDimensions:
+					self.typeDimensions[stimulus.keys[v]] = len(stimulus.values[v])
+		for key in pending:
+			for (stimulus, v), values in \
+			zip(pending[key], self.feedForwardBatch([stimulus.sources[v] for stimulus, v in pending[key]], key, None, tape)):
+				stimulus.values[v] = values
+		
+		#Then group the stimuli by the cortex that will process them
+		groups = {} #:(int list) dictionary, keyed by interned keys (cf Signature.intern())
+		batches = {} #:((float list) list) dictionary, keyed likewise
+		for s, stimulus in zip(range(len(distinct)), distinct):
+			inputs = []
+			for key, values in zip(stimulus.keys, stimulus.values):
+				assert len(values) == self.typeDimensions[key]
+				if stimulus.flat == None: inputs.extend(values)
+			if stimulus.flat != None: inputs = stimulus.flat
+			
+			group = stimulus.keyIds
+			if group not in groups:
+				groups[group] = []
+				batches[group] = []
+			groups[group].append(s)
+			batches[group].append(inputs)
+		
+		for group in groups:
+			cortex = self.cortexForKeys(group, len(batches[group][0]), outputsType, outputsCount)
+			if self.profile != None: start = time.perf_counter()
+			results = cortex.feedBatch(batches[group], tape)
+			if self.profile != None: self.profile.record(cortex, "forward", time.perf_counter() - start, len(results))
+			for s, outputs in zip(groups[group], results):
+				if tape:
+					if distinct[s].tape == None: distinct[s].tape = {}
+					distinct[s].tape[outputsType], outputs = outputs
+				distinct[s].activations[outputsType] = outputs
+				if id(distinct[s]) in keys: self.remember(keys[id(distinct[s])], list(outputs))
+		
+		return [stimulus.activations[outputsType] for stimulus in stimuli]
 	
 	#ERROR BACKPROPAGATION
 	def feedBackward(self, faults, outputsType, stimulus):
@@ -322,20 +1536,51 @@ class Brain:
 		faultsCount = len(faults)
 		assert self.typeDimensions[outputsType] == faultsCount
 		
-		#First, we have to find out what we would have output
-		outputs = self.feedForward(stimulus, outputsType)
-		inputs = []
-		for moreInputs in stimulus.values: inputs.extend(moreInputs)
+		#First, we have to find out what we would have output (unless it's on the tape already)
+		#Taping records the hidden activations of the sub-stimuli, too, so none of them gets fed forward again
+		outputs = self.feedForward(stimulus, outputsType, None, True)
+		if stimulus.flat != None: inputs = stimulus.flat
+		else:
+			inputs = []
+			for moreInputs in stimulus.values: inputs.extend(moreInputs)
 		
-		inputSignatures = [Signature(kind, self.typeDimensions[kind]) for kind in stimulus.keys]
-		outputSignature = Signature(outputsType, self.typeDimensions[outputsType])
-		assert len(inputs) == sum([inputSignature.dimensions for inputSignature in inputSignatures])
-		faultsUpstream = self.cortexForInputsOutput(inputSignatures, outputSignature).back(inputs, faults)
+		cortex = self.cortexForKeys(stimulus.keyIds, len(inputs), outputsType)
+		assert len(inputs) == cortex.inputDimensions
+		if self.profile != None: start = time.perf_counter()
+		faultsUpstream = cortex.back(inputs, faults, (stimulus.tape[outputsType], outputs))
+		if self.profile != None: self.profile.record(cortex, "backward", time.perf_counter() - start)
+		self.dirty.update(cortex.dendrons)
+		self.dirty.update(cortex.axons)
 		for key, source, values in zip(stimulus.keys, stimulus.sources, stimulus.values):
 			if type(source) == type(stimulus):
 				self.feedBackward(faultsUpstream[:len(values)], key, source)
 			faultsUpstream = faultsUpstream[len(values):]
 			
+	#Finds the cortex for inputs of the given kinds (whose dimensions we already know)
+	#Registers the count of outputs for the outputsType; if necessary, infers it from the count of inputs
+	def cortexForKeys(self, keyIds, inputsCount, outputsType, outputsCount = None): #Cortex
+		#keyIds : int tuple --- cf Signature.intern()
+		#inputsCount : int
+		#outputsType : string
+		#outputsCount : (int)
+		cortexKey = (keyIds, Signature.intern(outputsType))
+		if cortexKey in self.cortices \
+		and (outputsCount == None or outputsCount == self.typeDimensions[outputsType]):
+			return self.cortices[cortexKey]
+		
+		if outputsType not in self.typeDimensions:
+			if outputsCount == None:
+				outputsCount = int(0.5 + float(inputsCount)/2.0)
+			self.typeDimensions[outputsType] = outputsCount
+		elif outputsCount == None:
+			outputsCount = self.typeDimensions[outputsType]
+		assert self.typeDimensions[outputsType] == outputsCount
+		
+		keys = [Signature.kinds[keyId] for keyId in keyIds]
+		inputSignatures = [Signature(kind, self.typeDimensions[kind]) for kind in keys]
+		outputSignature = Signature(outputsType, self.typeDimensions[outputsType])
+		return self.cortexForInputsOutput(inputSignatures, outputSignature)
+	
 	#Finds the cortex (hidden + output layers) that can process given inputs to get a desired output
 	def cortexForInputsOutput(self, inputSignatures, outputSignature):
 		#inputSignatures : Signature list
@@ -343,15 +1588,17 @@ class Brain:
 		
 		assert outputSignature.__class__ == Signature
 		
-		inputsSummary = " * ".join([str(inputSignature) for inputSignature in inputSignatures])
-		outputsSummary = str(outputSignature)
-		
-		inputsCount = sum([inputSignature.dimensions for inputSignature in inputSignatures])
-		
-		cortexSignature = inputsSummary + " -> " + outputsSummary
+		#the dimensions of each kind are fixed per Brain (cf typeDimensions), so the kinds alone identify the cortex
+		cortexKey = (tuple([Signature.intern(inputSignature.kind) for inputSignature in inputSignatures]), \
+		Signature.intern(outputSignature.kind))
 		
 		#Returns the appropriate Cortex instance; if necessary, creates anew
-		if cortexSignature not in self.cortices:
+		#(the string signatures are only for naming the neurons, as persisted)
+		if cortexKey not in self.cortices:
+			inputsSummary = " * ".join([str(inputSignature) for inputSignature in inputSignatures])
+			outputsSummary = str(outputSignature)
+			inputsCount = sum([inputSignature.dimensions for inputSignature in inputSignatures])
+			
 			dendronsCount = int((inputsCount * outputSignature.dimensions)**(0.5)) + 1
 			dendrons = self.neuronsForSignatures( \
 			[inputsSummary + " -> " + str(d) + "/" + str(dendronsCount) for d in map(lambda d: d+1, range(dendronsCount))], \
@@ -364,21 +1611,327 @@ class Brain:
 			dendronsCount \
 			)
 			
-			self.cortices[cortexSignature] = \
-			Cortex(inputSignatures, dendrons, axons, outputSignature)
+			self.cortices[cortexKey] = \
+			Cortex(inputSignatures, dendrons, axons, outputSignature, self.vectorized, self.activation)
 		
-		return self.cortices[cortexSignature]
+		return self.cortices[cortexKey]
 	
 	#Finds neurons that will process what we're trying to process
 	def neuronsForSignatures(self, signatures, inputsCount):
 		#signatures : Signature list
 		#inputsCount : int
+		generation = self.buffer.generation
 		neurons = []
 		for signature in signatures:
+			if signature in self.unloaded: self.materialize([signature])
 			if signature not in self.neurons:
 				self.neurons[signature] = \
 				Neuron( \
-				[random.uniform(-self.randomWeightsRange, self.randomWeightsRange) for i in range(inputsCount+1)] \
-				) #remember the constant term!
+				[random.uniform(-self.randomWeightsRange, self.randomWeightsRange) for i in range(inputsCount+1)], \
+				False, self.typecode, self.buffer) #remember the constant term!
+				self.changed.add(self.neurons[signature])
 			neurons.append(self.neurons[signature])
-		return neurons
\ No newline at end of file
+		#growing the buffer moved every weight (cf WeightBuffer, supra)
+		if self.buffer.generation != generation: self.invalidate(True)
+		return neurons
+
+#Many brains in one indexed file (cf poolMagic, supra), keyed by name: one handle for a whole genepool,
+#   an index in memory, and no directory to scan
+#Puts and drops go in transactions (cf begin(), infra), which show in the index once committed
+#Records that later ones superseded stay in the file until they outweigh compaction times the rest (cf compact(), infra)
+#Journal records stay apart from the record they amend until then, too, or until the brain saves itself whole (cf Brain.checkpoint())
+class BrainStore:
+	def __init__(self, path, compaction = 1.0):
+		#path : string
+		#compaction : (float)
+		assert type(path) == type(str())
+		self.path = path
+		self.compaction = compaction
+		self.index = {} #:(int, int, int) dictionary --- offset, length & CRC-32 of each payload, keyed by name
+		self.journals = {} #:((int, int, int) list) dictionary --- those of the journal records amending each, in order
+		self.live = 0 #bytes of the records in the index and the journals
+		self.size = 0 #bytes up to the last commit
+		self.pending = [] #:(bytes, bytes, bytes) list --- kind, name & payload of each record of the open transaction
+		self.depth = 0
+		if not os.path.isfile(path):
+			with open(path, 'wb') as store: store.write(struct.pack("<4sI", poolMagic, poolVersion))
+		self.file = open(path, 'r+b')
+		self.scan()
+	
+	#Builds the index from the headers of the records, then drops whatever follows the last commit (e.g. after a crash)
+	def scan(self): #void
+		self.index, self.journals, self.live = {}, {}, 0
+		self.file.seek(0)
+		magic, version = struct.unpack("<4sI", self.file.read(struct.calcsize("<4sI")))
+		if magic != poolMagic: raise ValueError("%s isn't a pool file" % self.path)
+		if version != poolVersion: raise ValueError("Pool file version %i unhandled" % version)
+		recordSize = struct.calcsize(poolRecord)
+		position = self.size = struct.calcsize("<4sI")
+		records = []
+		while True:
+			head = self.file.read(recordSize)
+			if len(head) < recordSize: break
+			kind, nameLength, length, crc = struct.unpack(poolRecord, head)
+			if kind == b"C":
+				if length != len(records): break
+				for kind, name, offset, length, crc in records: self.enter(kind, name, offset, length, crc)
+				records = []
+				position = self.size = position + recordSize
+				continue
+			encoded = self.file.read(nameLength)
+			if len(encoded) < nameLength or kind not in (b"P", b"D", b"J"): break
+			records.append((kind, encoded.decode("utf-8"), position + recordSize + nameLength, length, crc))
+			position += recordSize + nameLength + length
+			self.file.seek(position)
+		self.file.seek(0, os.SEEK_END)
+		if self.file.tell() > self.size: self.file.truncate(self.size)
+	
+	#Applies a committed record to the index
+	def enter(self, kind, name, offset, length, crc): #void
+		#kind : bytes
+		#name : string
+		#offset : int --- of the payload
+		#length : int
+		#crc : int
+		nameLength = len(name.encode("utf-8"))
+		if kind == b"J":
+			#(of a record since dropped, it's garbage already)
+			if name not in self.index: return
+			self.journals[name].append((offset, length, crc))
+			self.live += struct.calcsize(poolRecord) + nameLength + length
+			return
+		if name in self.index:
+			for entry in [self.index.pop(name)] + self.journals.pop(name):
+				self.live -= struct.calcsize(poolRecord) + nameLength + entry[1]
+		if kind == b"P":
+			self.index[name] = (offset, length, crc)
+			self.journals[name] = []
+			self.live += struct.calcsize(poolRecord) + nameLength + length
+	
+	def names(self): #string list
+		return list(self.index.keys())
+	
+	def __contains__(self, name): return name in self.index
+	
+	#The payload under the name, as committed (without its journal, cf journaled(), infra)
+	def read(self, name, entry = None): #bytes
+		#name : string
+		#entry : ((int, int, int)) --- offset, length & CRC-32 of the record to read, if not the one in the index
+		offset, length, crc = self.index[name] if entry == None else entry
+		self.file.seek(offset)
+		payload = self.file.read(length)
+		if len(payload) != length or zlib.crc32(payload, zlib.crc32(name.encode("utf-8"))) != crc:
+			raise ValueError("Pool record of %s corrupt" % name)
+		return payload
+	
+	#The weights that the journal records under the name amend, the last record of a neuron winning (cf Brain.amend(), supra)
+	def journaled(self, name): #string dictionary --- the text of the weights, keyed by signature
+		#name : string
+		latest = {}
+		for entry in self.journals.get(name, []): latest.update(parseLines(self.read(name, entry).decode("utf-8")))
+		return latest
+	
+	#Bytes of the journal records under the name (cf Brain.checkpoint(), supra)
+	def journalSize(self, name): #int
+		#name : string
+		return sum([length for offset, length, crc in self.journals.get(name, [])])
+	
+	#The content of a brain file of the name: its payload, with its journal records folded in
+	def fold(self, name): #bytes
+		#name : string
+		if len(self.journals[name]) == 0: return self.read(name)
+		return Brain().loadFromStore(self, name).encode()
+	
+	#Loads the brains under the names (or else every brain), reading the records in the order of the file
+	def brains(self, names = None, lazy = False, **keywords): #Brain list, in order of names
+		#names : (string list)
+		#lazy : (Boolean)
+		#keywords : cf Brain.__init__(), supra
+		names = self.names() if names == None else list(names)
+		brains = {}
+		for name in sorted(names, key = lambda name: self.index[name][0] if name in self.index else -1):
+			brains[name] = Brain(**keywords).loadFromStore(self, name, lazy, self.read(name) if name in self.index else None)
+		return [brains[name] for name in names]
+	
+	#TRANSACTIONS
+	#Transactions nest: only the outermost commit() writes
+	def begin(self): #void
+		self.depth += 1
+	
+	def put(self, name, payload): #void
+		#name : string
+		#payload : bytes --- the content of a brain file (cf Brain.encode(), supra)
+		assert type(name) == type(str())
+		self.begin()
+		self.pending.append((b"P", name.encode("utf-8"), bytes(payload)))
+		self.commit()
+	
+	def drop(self, name): #void
+		#name : string
+		assert type(name) == type(str())
+		self.begin()
+		self.pending.append((b"D", name.encode("utf-8"), b""))
+		self.commit()
+	
+	def journal(self, name, records): #void
+		#name : string
+		#records : bytes --- signature tab weights, per changed neuron (cf Brain.checkpoint(), supra)
+		assert type(name) == type(str())
+		self.begin()
+		self.pending.append((b"J", name.encode("utf-8"), bytes(records)))
+		self.commit()
+	
+	#Writes the records of the transaction, then (once they're on disk) its commit
+	def commit(self): #void
+		assert self.depth > 0
+		self.depth -= 1
+		if self.depth > 0 or len(self.pending) == 0: return
+		records, self.pending = self.pending, []
+		pieces, entries = [], []
+		position = self.size
+		for kind, encoded, payload in records:
+			crc = zlib.crc32(payload, zlib.crc32(encoded))
+			pieces.append(struct.pack(poolRecord, kind, len(encoded), len(payload), crc) + encoded + payload)
+			position += len(pieces[-1])
+			entries.append((kind, encoded.decode("utf-8"), position - len(payload), len(payload), crc))
+		self.file.seek(self.size)
+		self.file.write(b"".join(pieces))
+		self.file.flush()
+		os.fsync(self.file.fileno())
+		self.file.write(struct.pack(poolRecord, b"C", 0, len(records), 0))
+		self.file.flush()
+		os.fsync(self.file.fileno())
+		for entry in entries: self.enter(*entry)
+		self.size = position + struct.calcsize(poolRecord)
+		if self.size - struct.calcsize("<4sI") - self.live > self.compaction * self.live: self.compact()
+	
+	#Forgets the records of the open transaction(s)
+	def abort(self): #void
+		self.pending, self.depth = [], 0
+	
+	#Rewrites the live records into a temporary file, as one transaction, then replaces the file with it
+	#Journal records get folded into the records they amend
+	def compact(self): #void
+		assert self.depth == 0
+		header = struct.pack("<4sI", poolMagic, poolVersion)
+		pieces, index = [header], {}
+		position = len(header)
+		for name in list(self.index.keys()):
+			encoded = name.encode("utf-8")
+			payload = self.fold(name)
+			length, crc = len(payload), zlib.crc32(payload, zlib.crc32(encoded))
+			pieces.append(struct.pack(poolRecord, b"P", len(encoded), length, crc) + encoded + payload)
+			position += len(pieces[-1])
+			index[name] = (position - length, length, crc)
+		pieces.append(struct.pack(poolRecord, b"C", 0, len(index), 0))
+		temporaryPath = self.path + temporarySuffix
+		with open(temporaryPath, 'wb') as store:
+			store.write(b"".join(pieces))
+			store.flush()
+			os.fsync(store.fileno())
+		self.file.close()
+		os.replace(temporaryPath, self.path)
+		self.file = open(self.path, 'r+b')
+		self.index, self.size = index, position + struct.calcsize(poolRecord)
+		self.journals = dict([(name, []) for name in index])
+		self.live = self.size - len(header) - struct.calcsize(poolRecord)
+	
+	#FILES
+	#Puts every brain file in the directory (along with its journal, cf Brain.checkpoint()) under its file name, in one transaction
+	def importPath(self, path): #void
+		#path : string --- of a directory
+		self.begin()
+		for root, dirs, files in os.walk(path):
+			for name in files:
+				if name.startswith(".") or name.endswith((journalSuffix, temporarySuffix)): continue
+				filePath = os.path.join(root, name)
+				if os.path.isfile(filePath + journalSuffix): self.put(name, Brain(filePath).encode())
+				else:
+					with open(filePath, 'rb') as store: self.put(name, store.read())
+		self.commit()
+	
+	#Writes every brain back to a file of its name in the directory (cf Brain.saveToPath(), supra)
+	def export(self, path): #void
+		#path : string --- of a directory
+		if not os.path.isdir(path): os.makedirs(path)
+		for name in self.names():
+			filePath = os.path.join(path, name)
+			with open(filePath + temporarySuffix, 'wb') as store:
+				store.write(self.fold(name))
+				store.flush()
+				os.fsync(store.fileno())
+			os.replace(filePath + temporarySuffix, filePath)
+			if os.path.isfile(filePath + journalSuffix): os.remove(filePath + journalSuffix)
+	
+	def close(self): #void
+		self.file.close()
+
+#Many brains, evaluated together: "how would every brain decide this?"
+#Same-signature cortices of all the brains stack into 3-D weight tensors (brain x neuron x weight),
+#   so that one forward pass yields the activations of every brain at once
+class BrainPopulation:
+	def __init__(self, brains):
+		#brains : Brain list
+		self.brains = list(brains)
+		for brain in self.brains: assert brain.__class__ == Brain
+		self.tensors = {} #:(Cortex list, numpy array tuple list, numpy array, numpy array) dictionary
+	
+	#Stacks the matrices of the given cortices (one per brain), reusing the stack while none has changed
+	def getTensors(self, cortices): #(numpy array, numpy array)
+		#cortices : Cortex list
+		key = tuple([id(cortex) for cortex in cortices])
+		matrices = [cortex.getMatrices() for cortex in cortices]
+		if key in self.tensors:
+			cached = self.tensors[key]
+			if False not in [m is c for m, c in zip(matrices, cached[1])]: return cached[2], cached[3]
+		hidden = numpy.stack([m[0] for m in matrices])
+		output = numpy.stack([m[1] for m in matrices])
+		#keep the cortices themselves, lest their ids get reused
+		self.tensors[key] = (cortices, matrices, hidden, output)
+		return hidden, output
+	
+	#CLASSIFICATION, for every brain
+	def feedForward(self, stimulus, outputsType, outputsCount = None, memo = None): #(float list) list, one per brain
+		#stimulus : Stimulus
+		#outputsType : string
+		#outputsCount : (int)
+		#memo : (dictionary) --- shares results among the calls for a single decision (cf Stimulus.fromDict())
+		assert stimulus.__class__ == Stimulus
+		if memo != None and (id(stimulus), outputsType) in memo: return memo[(id(stimulus), outputsType)][1]
+		stimulus.validate()
+		
+		#Stimulus.values caches the activations of a single Brain, so work from the sources instead
+		inputs = [[] for brain in self.brains]
+		for key, source in zip(stimulus.keys, stimulus.sources):
+			if type(source) == type(list()):
+				for brain, brainInputs in zip(self.brains, inputs):
+					if key not in brain.typeDimensions: brain.typeDimensions[key] = len(source)
+					assert len(source) == brain.typeDimensions[key]
+					brainInputs.extend(source)
+			else:
+				for brainInputs, values in zip(inputs, self.feedForward(source, key, None, memo)):
+					brainInputs.extend(values)
+		
+		cortices = [brain.cortexForKeys(stimulus.keyIds, len(brainInputs), outputsType, outputsCount) \
+		for brain, brainInputs in zip(self.brains, inputs)]
+		
+		#stack the brains whose cortices match in shape; feed any others one by one
+		activations = [None for brain in self.brains]
+		shapes = {}
+		for b, cortex in zip(range(len(cortices)), cortices):
+			if not cortex.vectorizable: activations[b] = cortex.feed(inputs[b])
+			else:
+				shape = (cortex.inputDimensions, len(cortex.dendrons), len(cortex.axons), cortex.activation)
+				if shape not in shapes: shapes[shape] = []
+				shapes[shape].append(b)
+		for shape in shapes:
+			members = shapes[shape]
+			hidden, output = self.getTensors([cortices[b] for b in members])
+			stimuli = numpy.array([inputs[b] for b in members], dtype = float).reshape(len(members), shape[0])
+			activation = shape[3]
+			throughputs = activation.vector(hidden[:, :, 0] + numpy.einsum("nhi,ni->nh", hidden[:, :, 1:], stimuli))
+			outputs = activation.vector(output[:, :, 0] + numpy.einsum("nah,nh->na", output[:, :, 1:], throughputs))
+			for b, brainOutputs in zip(members, outputs.tolist()): activations[b] = brainOutputs
+		
+		if memo != None: memo[(id(stimulus), outputsType)] = (stimulus, activations)
+		return activations
@@ -0,0 +1,5 @@
+#Copyright (c) Hans Andersson 2011
+#All rights reserved.
+
+#Tests for the NeuralNetwork module; run from the top directory:
+#   python -m unittest discover Tests
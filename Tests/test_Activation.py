@@ -0,0 +1,52 @@
+#Copyright (c) Hans Andersson 2011
+#All rights reserved.
+
+import math, unittest
+
+import NeuralNetwork
+
+#The sigmoid as it was, clamped after the fact; math.exp() overflows past a magnitude of about 709
+def clampedSigmoid(value): #float on [0.0, 1.0]
+	#value : float
+	return max(min(1 / (1 + math.exp(-value)), 1.0), 0.0)
+
+#Points over [-bound, bound]
+def grid(bound, samples): #float list
+	#bound : float
+	#samples : int
+	return [-bound + 2.0 * bound * float(i) / float(samples) for i in range(samples + 1)]
+
+#Every activation against clampedSigmoid(), supra, densely where the sigmoid bends, sparsely out to where it overflows
+class ActivationTest(unittest.TestCase):
+	points = grid(32.0, 20000) + grid(700.0, 2000)
+	
+	def deviation(self, activation): #float --- the largest, scalar & vector
+		#activation : Sigmoid
+		deviation = max([abs(activation.scalar(point) - clampedSigmoid(point)) for point in self.points])
+		if NeuralNetwork.numpy != None:
+			vector = activation.vector(NeuralNetwork.numpy.array(self.points)).tolist()
+			deviation = max(deviation, max([abs(v - clampedSigmoid(point)) for v, point in zip(vector, self.points)]))
+		return deviation
+	
+	def testSigmoid(self):
+		self.assertLess(self.deviation(NeuralNetwork.Sigmoid()), 1e-15)
+	
+	def testLookupSigmoid(self):
+		for bound, resolution in ((16.0, 64), (8.0, 16), (4.0, 4)):
+			activation = NeuralNetwork.LookupSigmoid(bound, resolution)
+			self.assertLessEqual(self.deviation(activation), activation.errorBound())
+	
+	def testMultiplier(self):
+		for point in grid(16.0, 1000):
+			self.assertAlmostEqual(NeuralNetwork.sigmoid(point, 2.0), clampedSigmoid(2.0 * point), delta = 1e-15)
+	
+	#where clampedSigmoid() would overflow
+	def testLargeMagnitudes(self):
+		for activation, tolerance in ((NeuralNetwork.Sigmoid(), 0.0), (NeuralNetwork.LookupSigmoid(), NeuralNetwork.LookupSigmoid().errorBound())):
+			self.assertAlmostEqual(activation.scalar(1e6), 1.0, delta = tolerance)
+			self.assertAlmostEqual(activation.scalar(-1e6), 0.0, delta = tolerance)
+			if NeuralNetwork.numpy != None:
+				vector = activation.vector(NeuralNetwork.numpy.array([-1e308, -1e6, 1e6, 1e308])).tolist()
+				for v in vector: self.assertTrue(not v < 0.0 and not v > 1.0)
+
+if __name__ == "__main__": unittest.main()
@@ -0,0 +1,124 @@
+#Copyright (c) Hans Andersson 2011
+#All rights reserved.
+
+import os, random, shutil, struct, tempfile, unittest
+
+import NeuralNetwork
+
+#A brain of a few neurons of random weights
+def randomBrain(seed, binary = False): #Brain
+	#seed : int
+	#binary : (Boolean)
+	random.seed(seed)
+	brain = NeuralNetwork.Brain(vectorized = False, binary = binary)
+	brain.neuronsForSignatures(["ownp * safe -> %i/5" % (d + 1) for d in range(5)], 12)
+	brain.neuronsForSignatures(["5 -> (%i/2) tactic" % (a + 1) for a in range(2)], 5)
+	return brain
+
+#Every neuron's weights, parsing those still unloaded
+def weightsOf(brain): #(float list) dictionary, keyed by signature
+	#brain : Brain
+	brain.materialize()
+	return dict([(summary, list(neuron.weights)) for summary, neuron in brain.neurons.items()])
+
+#Pool files keep what was committed, whether reopened, compacted, or written out to files and back (cf NeuralNetwork.poolMagic)
+class BrainStoreTest(unittest.TestCase):
+	names = ["Ada", "Bo", "Cy"]
+	
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, "brains.pool")
+		self.store = NeuralNetwork.BrainStore(self.path)
+		self.store.begin()
+		for seed, name in enumerate(self.names): randomBrain(seed, seed % 2 == 1).saveToStore(self.store, name)
+		self.store.commit()
+	
+	def tearDown(self):
+		self.store.close()
+		shutil.rmtree(self.directory)
+	
+	def reopen(self): #BrainStore
+		self.store.close()
+		self.store = NeuralNetwork.BrainStore(self.path)
+		return self.store
+	
+	def assertBrains(self, expected): #void
+		#expected : ((float list) dictionary) dictionary --- the weights of each brain, keyed by name
+		self.assertEqual(sorted(self.store.names()), sorted(expected.keys()))
+		for lazy in (False, True):
+			for name, brain in zip(self.store.names(), self.store.brains(lazy = lazy, vectorized = False)):
+				self.assertEqual(weightsOf(brain), expected[name])
+	
+	def testRoundTrip(self):
+		self.reopen()
+		self.assertBrains(dict([(name, weightsOf(randomBrain(seed))) for seed, name in enumerate(self.names)]))
+	
+	def testDrop(self):
+		self.store.drop("Bo")
+		self.reopen()
+		self.assertBrains(dict([(name, weightsOf(randomBrain(seed))) for seed, name in enumerate(self.names) if name != "Bo"]))
+	
+	#records without their commit (e.g. after a crash) get cut off on open
+	def testTornTransaction(self):
+		size = os.path.getsize(self.path)
+		#without the commit, or with it cut short
+		for cut in (struct.calcsize(NeuralNetwork.poolRecord), 1):
+			self.store.begin()
+			randomBrain(7).saveToStore(self.store, "Di")
+			self.store.drop("Cy")
+			self.store.commit()
+			with open(self.path, 'r+b') as store: store.truncate(os.path.getsize(self.path) - cut)
+			self.reopen()
+			self.assertEqual(os.path.getsize(self.path), size)
+			self.assertBrains(dict([(name, weightsOf(randomBrain(seed))) for seed, name in enumerate(self.names)]))
+	
+	#checkpoints append journal records, which replay on load until compaction folds them in
+	def testJournal(self):
+		brain = NeuralNetwork.Brain("Ada", vectorized = False, store = self.store)
+		brain.mutate(0.1, random.Random(2))
+		brain.checkpoint(8.0)
+		self.assertNotEqual(self.store.journalSize("Ada"), 0)
+		expected = dict([(name, weightsOf(randomBrain(seed))) for seed, name in enumerate(self.names)])
+		expected["Ada"] = weightsOf(brain)
+		self.reopen()
+		self.assertBrains(expected)
+		size = os.path.getsize(self.path)
+		self.store.compact()
+		self.assertLess(os.path.getsize(self.path), size)
+		self.assertEqual(self.store.journalSize("Ada"), 0)
+		self.reopen()
+		self.assertBrains(expected)
+	
+	#superseded records stay in the file until they outweigh compaction times the live ones
+	def testCompaction(self):
+		header = struct.calcsize("<4sI")
+		for seed in range(20):
+			randomBrain(seed).saveToStore(self.store, "Bo")
+			self.assertEqual(os.path.getsize(self.path), self.store.size)
+			self.assertFalse(self.store.size - header - self.store.live > self.store.compaction * self.store.live)
+		self.reopen()
+		self.assertEqual(weightsOf(self.store.brains(["Bo"], vectorized = False)[0]), weightsOf(randomBrain(19)))
+	
+	def testExportImport(self):
+		brain = NeuralNetwork.Brain("Ada", vectorized = False, store = self.store)
+		brain.mutate(0.1, random.Random(2))
+		brain.checkpoint(8.0)
+		expected = dict([(name, weightsOf(randomBrain(seed))) for seed, name in enumerate(self.names)])
+		expected["Ada"] = weightsOf(brain)
+		exported = os.path.join(self.directory, "brains")
+		self.store.export(exported)
+		self.assertEqual(sorted(os.listdir(exported)), sorted(self.names))
+		for name in self.names:
+			self.assertEqual(weightsOf(NeuralNetwork.Brain(os.path.join(exported, name), vectorized = False)), expected[name])
+		#a file's journal gets folded into what's imported
+		brain = NeuralNetwork.Brain(os.path.join(exported, "Bo"), vectorized = False)
+		brain.mutate(0.1, random.Random(3))
+		brain.checkpoint(8.0)
+		self.assertTrue(os.path.isfile(brain.path + NeuralNetwork.journalSuffix))
+		expected["Bo"] = weightsOf(brain)
+		self.store.close()
+		self.store = NeuralNetwork.BrainStore(os.path.join(self.directory, "imported.pool"))
+		self.store.importPath(exported)
+		self.assertBrains(expected)
+
+if __name__ == "__main__": unittest.main()
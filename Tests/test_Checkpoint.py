@@ -0,0 +1,104 @@
+#Copyright (c) Hans Andersson 2011
+#All rights reserved.
+
+import os, random, shutil, tempfile, unittest
+
+import NeuralNetwork
+
+#A brain file of a few neurons of random weights
+def randomBrainPath(directory, seed, binary = False): #string
+	#directory : string
+	#seed : int
+	#binary : (Boolean)
+	random.seed(seed)
+	brain = NeuralNetwork.Brain(vectorized = False, binary = binary)
+	brain.neuronsForSignatures(["ownp * safe -> %i/5" % (d + 1) for d in range(5)], 12)
+	brain.neuronsForSignatures(["5 -> (%i/2) tactic" % (a + 1) for a in range(2)], 5)
+	return brain.saveToPath(os.path.join(directory, "brain")).path
+
+#Every neuron's weights, parsing those still unloaded
+def weightsOf(brain): #(float list) dictionary, keyed by signature
+	#brain : Brain
+	brain.materialize()
+	return dict([(summary, list(neuron.weights)) for summary, neuron in brain.neurons.items()])
+
+#Journals replay over their brain file on load, all but a block cut short or corrupt (cf NeuralNetwork.journalMagic)
+class CheckpointTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+	
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+	
+	#Loads the brain, mutates it and checkpoints it; returns its weights as checkpointed
+	def train(self, path, seed): #(float list) dictionary
+		#path : string
+		#seed : int
+		brain = NeuralNetwork.Brain(path, vectorized = False)
+		brain.mutate(0.1, random.Random(seed))
+		self.assertNotEqual(len(brain.changed), 0)
+		#(this brain is small enough for most of it to change, so its journal may well outgrow it)
+		brain.checkpoint(8.0)
+		return weightsOf(brain)
+	
+	def testReplay(self):
+		for binary in (False, True):
+			path = randomBrainPath(self.directory, 1, binary)
+			with open(path, 'rb') as store: saved = store.read()
+			expected = self.train(path, 2)
+			#the file itself stays as it was
+			with open(path, 'rb') as store: self.assertEqual(store.read(), saved)
+			self.assertTrue(os.path.isfile(path + NeuralNetwork.journalSuffix))
+			self.assertEqual(weightsOf(NeuralNetwork.Brain(path, vectorized = False)), expected)
+			self.assertEqual(weightsOf(NeuralNetwork.Brain(path, vectorized = False, lazy = True)), expected)
+	
+	def testTornBlock(self):
+		path = randomBrainPath(self.directory, 1)
+		journalPath = path + NeuralNetwork.journalSuffix
+		expected = self.train(path, 2)
+		size = os.path.getsize(journalPath)
+		#cut short within the records, or within the line that closes them
+		for closing in (False, True):
+			self.train(path, 3)
+			with open(journalPath, 'r+b') as store: store.truncate(os.path.getsize(journalPath) - 3 if closing else size + 10)
+			self.assertEqual(weightsOf(NeuralNetwork.Brain(path, vectorized = False)), expected)
+			#and the load drops what it couldn't read, so that later blocks append to the last complete one
+			self.assertEqual(os.path.getsize(journalPath), size)
+	
+	def testCorruptBlock(self):
+		path = randomBrainPath(self.directory, 1)
+		journalPath = path + NeuralNetwork.journalSuffix
+		expected = self.train(path, 2)
+		size = os.path.getsize(journalPath)
+		self.train(path, 3)
+		with open(journalPath, 'rb') as store: data = bytearray(store.read())
+		#a digit of a weight of the second block, so that its CRC-32 no longer matches
+		position = data.index(b"|", size) + 2
+		data[position:position + 1] = b"9" if data[position:position + 1] != b"9" else b"8"
+		with open(journalPath, 'wb') as store: store.write(bytes(data))
+		self.assertEqual(weightsOf(NeuralNetwork.Brain(path, vectorized = False)), expected)
+	
+	#e.g. left over by a crash between replacing the file and removing its journal
+	def testStaleJournal(self):
+		path = randomBrainPath(self.directory, 1)
+		journalPath = path + NeuralNetwork.journalSuffix
+		self.train(path, 2)
+		shutil.copy(journalPath, journalPath + ".old")
+		brain = NeuralNetwork.Brain(path, vectorized = False)
+		brain.mutate(0.1, random.Random(3))
+		brain.save()
+		self.assertFalse(os.path.isfile(journalPath))
+		expected = weightsOf(brain)
+		os.replace(journalPath + ".old", journalPath)
+		self.assertEqual(weightsOf(NeuralNetwork.Brain(path, vectorized = False)), expected)
+	
+	#once the journal outgrows compaction times the file, the brain saves itself whole
+	def testCompaction(self):
+		path = randomBrainPath(self.directory, 1)
+		brain = NeuralNetwork.Brain(path, vectorized = False)
+		brain.mutate(0.1, random.Random(2))
+		brain.checkpoint(0.0)
+		self.assertFalse(os.path.isfile(path + NeuralNetwork.journalSuffix))
+		self.assertEqual(weightsOf(NeuralNetwork.Brain(path, vectorized = False)), weightsOf(brain))
+
+if __name__ == "__main__": unittest.main()
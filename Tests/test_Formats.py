@@ -0,0 +1,76 @@
+#Copyright (c) Hans Andersson 2011
+#All rights reserved.
+
+import os, random, shutil, tempfile, unittest
+
+import NeuralNetwork
+
+#A brain of a few neurons of random weights, named as cortices name them (one for stimuli without keys, too)
+def randomBrain(seed, binary = False): #Brain
+	#seed : int
+	#binary : (Boolean)
+	random.seed(seed)
+	brain = NeuralNetwork.Brain(vectorized = False, binary = binary)
+	brain.neuronsForSignatures(["ownp * safe -> %i/5" % (d + 1) for d in range(5)], 12)
+	brain.neuronsForSignatures(["5 -> (%i/2) tactic" % (a + 1) for a in range(2)], 5)
+	brain.neuronsForSignatures([" -> 1/1"], 0)
+	return brain
+
+#Every neuron's weights, parsing those still unloaded
+def weightsOf(brain): #(float list) dictionary, keyed by signature
+	#brain : Brain
+	brain.materialize()
+	return dict([(summary, list(neuron.weights)) for summary, neuron in brain.neurons.items()])
+
+#Brains saved in either format load back with every weight exactly as it was, however they load
+class FormatsTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+	
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+	
+	def roundTrip(self, binary, **keywords): #Brain --- loaded back
+		#binary : Boolean
+		#keywords : cf Brain.__init__()
+		path = os.path.join(self.directory, "brain")
+		randomBrain(1, binary).saveToPath(path)
+		with open(path, 'rb') as store: self.assertEqual(store.read(4) == NeuralNetwork.binaryMagic, binary)
+		return NeuralNetwork.Brain(path, vectorized = False, **keywords)
+	
+	def testText(self):
+		self.assertEqual(weightsOf(self.roundTrip(False)), weightsOf(randomBrain(1)))
+	
+	def testBinary(self):
+		self.assertEqual(weightsOf(self.roundTrip(True)), weightsOf(randomBrain(1)))
+	
+	def testMapped(self):
+		brain = self.roundTrip(True, mapped = True)
+		self.assertNotEqual(brain.mapping, None)
+		self.assertEqual(weightsOf(brain), weightsOf(randomBrain(1)))
+	
+	def testLazy(self):
+		for binary in (False, True):
+			brain = self.roundTrip(binary, lazy = True)
+			self.assertEqual(len(brain.neurons), 0)
+			self.assertEqual(sorted(brain.unloaded.keys()), sorted(weightsOf(randomBrain(1)).keys()))
+			self.assertEqual(weightsOf(brain), weightsOf(randomBrain(1)))
+	
+	#writing to a mapped brain copies its weights first, so that saving over its own file keeps them whole
+	def testMappedWrite(self):
+		brain = self.roundTrip(True, mapped = True)
+		brain.mutate(0.5, random.Random(2))
+		expected = weightsOf(brain)
+		self.assertNotEqual(expected, weightsOf(randomBrain(1)))
+		brain.saveToPath(brain.path)
+		self.assertEqual(weightsOf(NeuralNetwork.Brain(brain.path, vectorized = False)), expected)
+	
+	def testConversion(self):
+		path = os.path.join(self.directory, "brain")
+		randomBrain(1).saveToPath(path)
+		for binary in (True, False):
+			NeuralNetwork.convertPath(path, binary)
+			self.assertEqual(NeuralNetwork.Brain(path).binary, binary)
+			self.assertEqual(weightsOf(NeuralNetwork.Brain(path, vectorized = False)), weightsOf(randomBrain(1)))
+
+if __name__ == "__main__": unittest.main()
@@ -0,0 +1,64 @@
+#Copyright (c) Hans Andersson 2011
+#All rights reserved.
+
+import random, unittest
+
+import NeuralNetwork
+
+#A scalar cortex of neurons of random weights, and one just like it (the same weights, in neurons of its own)
+def twinCortices(seed, inputsCount, vectorized = False): #(Cortex, Cortex)
+	#seed : int
+	#inputsCount : int
+	#vectorized : (Boolean) --- the twin, if numpy is available
+	rng = random.Random(seed)
+	dendronsCount, axonsCount = 6, 2
+	dendrons = [[rng.uniform(-1.0, 1.0) for i in range(inputsCount + 1)] for d in range(dendronsCount)]
+	axons = [[rng.uniform(-1.0, 1.0) for i in range(dendronsCount + 1)] for a in range(axonsCount)]
+	return tuple([NeuralNetwork.Cortex([NeuralNetwork.Signature("ownp", inputsCount)], \
+	[NeuralNetwork.Neuron(weights) for weights in dendrons], [NeuralNetwork.Neuron(weights) for weights in axons], \
+	NeuralNetwork.Signature("tactic", axonsCount), twin and vectorized) for twin in (False, True)])
+
+#Inputs of which only every so many are nonzero (some of them negative)
+def sparseInputs(seed, inputsCount, every): #float list
+	#seed : int
+	#inputsCount : int
+	#every : int
+	rng = random.Random(seed)
+	return [rng.uniform(-1.0, 1.0) if i % every == 0 else 0.0 for i in range(inputsCount)]
+
+#Cortices that skip the zero inputs (cf NeuralNetwork.Cortex.sparse()) feed and back exactly what dense ones do
+class SparseTest(unittest.TestCase):
+	inputsCount = 40
+	
+	#Feeds and backs the inputs through the cortex a few times; returns the outputs, the faults upstream and the backed sums
+	def train(self, cortex, inputs): #(float list, float list, (float list) list)
+		#cortex : Cortex
+		#inputs : float list
+		outputs, faults = None, None
+		for pass_ in range(3):
+			outputs = cortex.feed(inputs)
+			faults = cortex.back(inputs, [1.0 - output for output in outputs])
+		backs = [list(neuron.backs) for neuron in cortex.dendrons + cortex.axons]
+		return outputs, faults, backs
+	
+	def testGradients(self):
+		for every in (3, 4, 10):
+			sparse, dense = twinCortices(every, self.inputsCount)
+			#dense, however few inputs are nonzero
+			dense.sparseShare = 0.0
+			inputs = sparseInputs(every, self.inputsCount, every)
+			self.assertNotEqual(sparse.sparse(inputs), None)
+			self.assertEqual(dense.sparse(inputs), None)
+			self.assertEqual(self.train(sparse, inputs), self.train(dense, inputs))
+	
+	#and vectorized cortices, which never skip any, back about the same
+	def testVectorized(self):
+		if NeuralNetwork.numpy == None: return
+		sparse, vectorized = twinCortices(4, self.inputsCount, True)
+		self.assertTrue(vectorized.vectorized)
+		inputs = sparseInputs(4, self.inputsCount, 4)
+		expected, actual = self.train(sparse, inputs), self.train(vectorized, inputs)
+		for e, a in zip(expected[0] + expected[1] + sum(expected[2], []), actual[0] + actual[1] + sum(actual[2], [])):
+			self.assertAlmostEqual(e, a, delta = 1e-12)
+
+if __name__ == "__main__": unittest.main()